@@ -1,10 +1,460 @@
+import array
+import bisect
+import functools
+import json
+import math
+import mmap
+import queue
+import struct
+import sys
+import time
 import tkinter as tk
+import weakref
 
-__all__ = ["IkCanvas", "IkScrollBar"]
+__all__ = [
+    "IkCanvas", "IkScrollBar", "IkVirtualList", "IkRegionLoader", "IkMiniMap",
+    "IkScrollGroup", "IkStyle", "IkLayoutBatch", "IkProfiler",
+]
+
+
+# 平滑滚动的缓动函数，输入输出均为0~1
+_EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t * t,
+    "ease_out": lambda t: 1 - (1 - t) ** 3,
+    "ease_in_out": lambda t: 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2,
+}
+
+
+# 画布的滚动状态，缓存在Python侧，避免反复向Tk查询_locate的坐标
+class _ScrollState:
+    __slots__ = (
+        "x", "y", "right", "down", "width", "height", "scale",
+        "vx", "vy", "vx_time", "vy_time", "pending_x", "pending_y", "pending_id", "anim", "anim_id", "anim_limit",
+    )
+
+    def __init__(self):
+        self.x: float = 0.0  # 定位坐标x，即x已移动距离的相反数
+        self.y: float = 0.0  # 定位坐标y
+        self.right: int = 0  # 右部可移动距离
+        self.down: int = 0  # 底部可移动距离
+        self.width: int = 0  # 展示的宽度
+        self.height: int = 0  # 展示的高度
+        self.scale: float = 1.0  # 缩放比例
+        # 滚动速度（像素/秒），正数表示已移动距离增加，以及最近一次移动的时间
+        self.vx = self.vy = self.vx_time = self.vy_time = 0.0
+        # 合并滚动事件时累加的移动距离，与待执行的after id
+        self.pending_x = self.pending_y = 0.0
+        self.pending_id = None
+        # 平滑滚动
+        self.anim = None  # 当前动画，接收时间返回(目标x移动距离, 目标y移动距离, 是否结束)
+        self.anim_id = None  # 下一帧的after id
+        self.anim_limit = 500.0  # 每帧最大移动距离，根据耗时自动调整
+
+
+# 滚动条滑块的状态，缓存在Python侧，__slots__减少每个滚动条的内存，拖动时原地更新
+class _SliderState:
+    __slots__ = (
+        "x0", "y0", "x1", "y1", "drawn", "color", "in_slider",
+        "press", "press_x", "press_y", "drag_time", "drag_velocity", "saved_calls",
+    )
+
+    def __init__(self):
+        self.x0 = self.y0 = self.x1 = self.y1 = 0.0  # 滑块坐标，未取整
+        self.drawn: tuple[int, int, int, int] = (0, 0, 0, 0)  # 已发送给Tk的取整坐标
+        self.color = "normal"  # 颜色状态：normal、focus、press
+        self.in_slider = False  # 鼠标是否在滑块中
+        self.press = False  # 鼠标是否按下
+        self.press_x = self.press_y = 0  # 上一次鼠标的位置
+        self.drag_time = 0.0  # 上次拖动的时间
+        self.drag_velocity = 0.0  # 拖动速度（画布像素/秒），用于惯性滚动
+        self.saved_calls = 0  # 省去的Tcl调用次数
+
+
+# 类级别共用的事件绑定，每个解释器的每种事件只注册一次Tcl命令，控件通过bindtags接收事件
+_shared_roots: dict[str, weakref.WeakSet] = {}  # 标签 -> 已绑定的根窗口
+
+
+def _bind_shared(widget: tk.Misc, tag: str, cls: type, handlers: dict):
+    roots = _shared_roots.setdefault(tag, weakref.WeakSet())
+    root = widget._root()
+    if root not in roots:
+        roots.add(root)
+        for sequence, handler in handlers.items():
+            root.bind_class(tag, sequence, functools.partial(_dispatch_shared, cls, handler))
+    tags = widget.bindtags()
+    widget.bindtags((tags[0], tag) + tags[1:])  # 控件自身的绑定之后、Tk类绑定之前
+
+
+def _dispatch_shared(cls: type, handler, event):
+    if isinstance(event.widget, cls): handler(event.widget, event)
+
+
+# 网格桶空间索引，按固定大小的格子登记包围盒，查询只需遍历相交的格子
+class _GridIndex:
+    __slots__ = ("cell", "_cells", "_boxes", "_large", "observers")
+
+    def __init__(self, cell: int = 256):
+        self.cell = cell  # 格子边长
+        self._cells: dict[tuple[int, int], set] = {}  # 格子 -> 键集合
+        self._boxes: dict = {}  # 键 -> 包围盒(x0, y0, x1, y1)
+        self._large: set = set()  # 跨越格子过多的键，单独存放，每次查询都检查
+        self.observers: list = []  # 包围盒改变时的回调函数，参数为(包围盒, 1登记/-1移除)，清空时为(None, 0)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, key) -> bool:
+        return key in self._boxes
+
+    def bbox(self, key) -> tuple[float, float, float, float] | None:
+        return self._boxes.get(key)
+
+    def __cell_range(self, x0, y0, x1, y1) -> tuple[range, range]:
+        cell = self.cell
+        return range(int(x0 // cell), int(x1 // cell) + 1), range(int(y0 // cell), int(y1 // cell) + 1)
+
+    def insert(self, key, x0, y0, x1, y1):
+        if key in self._boxes: self.remove(key)
+        if x0 > x1: x0, x1 = x1, x0
+        if y0 > y1: y0, y1 = y1, y0
+        self._boxes[key] = (x0, y0, x1, y1)
+        for func in self.observers: func((x0, y0, x1, y1), 1)
+        cols, rows = self.__cell_range(x0, y0, x1, y1)
+        if len(cols) * len(rows) > 64:  # 背景等大元素不拆进格子
+            self._large.add(key)
+            return
+        cells = self._cells
+        for col in cols:
+            for row in rows:
+                bucket = cells.get((col, row))
+                if bucket is None: cells[(col, row)] = {key}
+                else: bucket.add(key)
+
+    def remove(self, key) -> bool:
+        box = self._boxes.pop(key, None)
+        if box is None: return False
+        for func in self.observers: func(box, -1)
+        if key in self._large:
+            self._large.discard(key)
+            return True
+        cells = self._cells
+        cols, rows = self.__cell_range(*box)
+        for col in cols:
+            for row in rows:
+                bucket = cells.get((col, row))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket: del cells[(col, row)]
+        return True
+
+    def move(self, key, x, y):
+        box = self._boxes.get(key)
+        if box is not None:
+            self.insert(key, box[0] + x, box[1] + y, box[2] + x, box[3] + y)
+
+    def clear(self):
+        self._cells.clear()
+        self._boxes.clear()
+        self._large.clear()
+        for func in self.observers: func(None, 0)
+
+    def query(self, x0, y0, x1, y1) -> set:
+        """
+        查询与矩形相交的键
+        """
+        if x0 > x1: x0, x1 = x1, x0
+        if y0 > y1: y0, y1 = y1, y0
+        boxes, cells = self._boxes, self._cells
+        cols, rows = self.__cell_range(x0, y0, x1, y1)
+        if len(cols) * len(rows) > len(cells):  # 查询范围比已有格子还多，直接遍历格子
+            candidates = set().union(*cells.values()) if cells else set()
+        else:
+            candidates = set()
+            for col in cols:
+                for row in rows:
+                    bucket = cells.get((col, row))
+                    if bucket: candidates |= bucket
+        candidates |= self._large
+        result = set()
+        for key in candidates:
+            box = boxes[key]
+            if box[0] <= x1 and box[2] >= x0 and box[1] <= y1 and box[3] >= y0:
+                result.add(key)
+        return result
+
+    def query_point(self, x, y) -> set:
+        """
+        查询包含点的键
+        """
+        cell = self.cell
+        boxes = self._boxes
+        result = set()
+        for keys in (self._cells.get((int(x // cell), int(y // cell)), ()), self._large):
+            for key in keys:
+                box = boxes[key]
+                if box[0] <= x <= box[2] and box[1] <= y <= box[3]:
+                    result.add(key)
+        return result
+
+
+# 父容器大小改变的调度器，每个父容器一个，把一连串<Configure>合并为每个空闲周期一次布局
+class _ResizeScheduler:
+    _schedulers: dict = {}  # 父容器 -> 调度器
+
+    def __init__(self, master):
+        self.master = master
+        self.widgets: list = []  # 跟随父容器大小的IkCanvas、IkScrollBar
+        self.__size: tuple[int, int] | None = None  # 上次布局时父容器的尺寸
+        self.__after_id = None
+        self.__bind_id = master.bind("<Configure>", self.__on_configure, add=True)
+
+    # 登记控件
+    @classmethod
+    def attach(cls, widget, layout: bool = False):
+        """
+        :param layout: 是否在空闲时主动布局一次，用于延迟初始化的控件，父容器已显示时不会再有<Configure>
+        """
+        scheduler = cls._schedulers.get(widget.master)
+        if scheduler is None:
+            scheduler = cls._schedulers[widget.master] = cls(widget.master)
+        scheduler.widgets.append(widget)
+        scheduler.__size = None  # 新控件需要完整布局一次
+        if layout: scheduler.__schedule()
+
+    # 立即布局所有父容器上的控件
+    @classmethod
+    def flush_all(cls):
+        for scheduler in tuple(cls._schedulers.values()):
+            if scheduler.__after_id is not None:
+                scheduler.master.after_cancel(scheduler.__after_id)
+            scheduler.__flush()
+
+    # 注销控件，父容器上没有控件后解绑
+    @classmethod
+    def detach(cls, widget):
+        scheduler = cls._schedulers.get(widget.master)
+        if scheduler is None or widget not in scheduler.widgets: return
+        scheduler.widgets.remove(widget)
+        if scheduler.widgets: return
+        del cls._schedulers[widget.master]
+        if scheduler.__after_id is not None:
+            scheduler.master.after_cancel(scheduler.__after_id)
+        try:
+            scheduler.master.unbind("<Configure>", scheduler.__bind_id)
+        except tk.TclError:  # 父容器已销毁
+            pass
+
+    def __on_configure(self, event):
+        # 父容器是Tk或Toplevel时，子控件的<Configure>也会触发，只处理父容器自身的
+        if str(event.widget) != str(self.master): return
+        self.__schedule()
+
+    def __schedule(self):
+        if self.__after_id is None:
+            self.__after_id = self.master.after_idle(self.__flush)
+
+    # 一次性布局所有控件
+    def __flush(self):
+        self.__after_id = None
+        size = self.master.winfo_width(), self.master.winfo_height()
+        if size == self.__size or size == (1, 1): return  # 尺寸未变，或父容器尚未布局
+        self.__size = size
+        for widget in tuple(self.widgets):
+            widget._master_layout(*size)
+
+
+# 场景快照的文件格式：文件头 + 按列存放的元素数据 + JSON字符串区，数值均为小端
+_SCENE_MAGIC = b"IKSN"
+_SCENE_VERSION = 1
+# 魔数, 版本, 元素数, 坐标总数, 字符串区字节数, 保留, 已移动距离x、y, 比值x、y, 缩放比例, 画布宽、高
+_SCENE_HEADER = struct.Struct("<4sHIIII7d")
+_SCENE_KINDS = ("rectangle", "oval", "line", "polygon", "arc", "text", "image", "bitmap")
+# 内部元素的标签，快照不保存也不清除
+_INTERNAL_TAGS = ("ik_static_tile", "ik_row", "ik_placeholder", "ik_profiler")
+
+
+# 按小端读写数值列
+def _column_bytes(column: array.array) -> bytes:
+    if sys.byteorder == "big":
+        column = array.array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _column_from(typecode: str, data, offset: int, length: int) -> tuple[array.array, int]:
+    column = array.array(typecode)
+    end = offset + length * column.itemsize
+    column.frombytes(data[offset:end])
+    if sys.byteorder == "big": column.byteswap()
+    return column, end
+
+
+# 虚拟元素的描述，只保存绘制参数，进入视口时才创建真实的Tk元素
+class _VirtualItem:
+    __slots__ = ("kind", "coords", "options", "item")
+
+    def __init__(self, kind: str, coords: tuple[float, ...], options: dict):
+        self.kind = kind
+        self.coords = coords  # 逻辑坐标，即未滚动时的画布坐标
+        self.options = options
+        self.item: int | None = None  # 已创建的Tk元素id，未进入视口时为None
+
+
+# 画布的虚拟元素状态，第一次使用虚拟元素时才创建
+class _VirtualState:
+    __slots__ = ("index", "items", "shown", "visible", "pool", "next", "window", "hits", "misses", "unmeasured")
+
+    def __init__(self):
+        self.index = _GridIndex()  # 虚拟元素的空间索引，逻辑坐标
+        self.items: dict[int, _VirtualItem] = {}  # 虚拟元素id -> 描述
+        self.shown: set[int] = set()  # 已创建Tk元素的虚拟元素id
+        self.visible: set[int] = set()  # 在视口内的虚拟元素id
+        self.pool: dict[tuple, list[int]] = {}  # 回收的Tk元素，按(类型, 参数名)分组
+        self.next = 1  # 下一个虚拟元素id
+        self.window: tuple[tuple, tuple] | None = None  # 最近一次计算的(需要创建的范围, 视口范围)，视口改变后失效
+        self.hits, self.misses = 0, 0  # 进入视口时已/未预先创建的虚拟元素数
+        self.unmeasured: set[int] = set()  # 只有锚点坐标、未指定bbox的虚拟元素id，第一次创建Tk元素时按实际大小更新索引
+
+
+# 画布内容的边界，开启auto_extent时才创建
+class _ExtentState:
+    __slots__ = ("min_size", "right", "bottom", "dirty", "after_id")
+
+    def __init__(self, width, height):
+        self.min_size = (width, height)  # 画布的最小大小
+        self.right = self.bottom = 0.0  # 内容的右部、底部坐标，逻辑坐标
+        self.dirty = False  # 边界上的元素被移除或缩小，需要重新统计
+        self.after_id = None  # 待执行的边界同步after id
+
+
+# 静态内容的分块缓存，把矢量元素光栅化为PhotoImage分块，只显示视口内的分块
+class _StaticLayer:
+    def __init__(self, canvas: "IkCanvas", tile_size: int, max_bytes: int):
+        self.canvas = canvas
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.shapes: list[tuple[str, float, float, float, float]] = []  # 按绘制顺序排列的(颜色, x0, y0, x1, y1)，逻辑坐标
+        self.index = _GridIndex(tile_size)  # 图形序号的空间索引
+        self.tiles: dict[tuple[int, int], list] = {}  # 分块 -> [PhotoImage, 图片元素id或None]，按最近使用排序
+        self.visible: set[tuple[int, int]] = set()  # 显示中的分块
+
+    # 把元素转换为填充矩形，无法光栅化时返回None
+    def extract(self, item: int) -> list[tuple[str, float, float, float, float]] | None:
+        canvas = self.canvas
+        kind = canvas.type(item)
+        if kind not in ["rectangle", "line"] or canvas.itemcget(item, "state") == "hidden": return None
+        if canvas.itemcget(item, "dash"): return None  # 虚线不支持
+        coords = canvas._to_logical(canvas.coords(item))
+        width = float(canvas.itemcget(item, "width") or 0) / canvas._state.scale
+        half = width / 2
+        if kind == "line":
+            if len(coords) != 4: return None
+            x0, y0, x1, y1 = coords
+            fill = canvas.itemcget(item, "fill")
+            if not fill: return []
+            if y0 == y1:  # 水平线
+                return [(fill, min(x0, x1), y0 - half, max(x0, x1), y0 + half)]
+            if x0 == x1:  # 垂直线
+                return [(fill, x0 - half, min(y0, y1), x0 + half, max(y0, y1))]
+            return None  # 斜线保留为矢量
+        x0, y0, x1, y1 = coords
+        shapes = []
+        fill, outline = canvas.itemcget(item, "fill"), canvas.itemcget(item, "outline")
+        if fill:
+            shapes.append((fill, x0, y0, x1, y1))
+        if outline and width > 0:  # 轮廓线以边界为中心
+            shapes += [
+                (outline, x0 - half, y0 - half, x1 + half, y0 + half),
+                (outline, x0 - half, y1 - half, x1 + half, y1 + half),
+                (outline, x0 - half, y0 - half, x0 + half, y1 + half),
+                (outline, x1 - half, y0 - half, x1 + half, y1 + half),
+            ]
+        return shapes
+
+    def add(self, shapes):
+        for shape in shapes:
+            self.index.insert(len(self.shapes), *shape[1:])
+            self.shapes.append(shape)
+
+    # 绘制分块，分块按缩放后的坐标划分
+    def render(self, key: tuple[int, int]) -> tk.PhotoImage:
+        size, scale = self.tile_size, self.canvas._state.scale
+        left, top = key[0] * size, key[1] * size
+        image = tk.PhotoImage(master=self.canvas, width=size, height=size)
+        query = self.index.query(left / scale, top / scale, (left + size) / scale, (top + size) / scale)
+        for number in sorted(query):
+            color, x0, y0, x1, y1 = self.shapes[number]
+            x0, y0 = max(int(round(x0 * scale - left)), 0), max(int(round(y0 * scale - top)), 0)
+            x1, y1 = min(int(round(x1 * scale - left)), size), min(int(round(y1 * scale - top)), size)
+            if x1 <= x0 or y1 <= y0:  # 不足1像素的图形至少画1像素
+                x1, y1 = max(x1, min(x0 + 1, size)), max(y1, min(y0 + 1, size))
+                if x1 <= x0 or y1 <= y0: continue
+            image.put(color, to=(x0, y0, x1, y1))
+        return image
+
+    # 按视口更新显示的分块
+    def update(self, left: float, top: float, right: float, bottom: float):
+        canvas, size, tiles = self.canvas, self.tile_size, self.tiles
+        off_x, off_y = canvas._canvas_offset()
+        wanted = {
+            (col, row)
+            for col in range(int(left // size), int(right // size) + 1)
+            for row in range(int(top // size), int(bottom // size) + 1)
+        }
+        for key in self.visible - wanted:
+            tile = tiles.get(key)
+            if tile is not None and tile[1] is not None:
+                canvas.itemconfig(tile[1], state="hidden")
+        for key in wanted:
+            tile = tiles.pop(key, None)
+            if tile is None:
+                tile = [self.render(key), None]
+            tiles[key] = tile  # 移到最近使用的位置
+            x, y = key[0] * size + off_x, key[1] * size + off_y
+            if tile[1] is None:
+                tile[1] = tk.Canvas._create(
+                    canvas, "image", (x, y), {"image": tile[0], "anchor": "nw", "tags": "ik_static_tile"}
+                )
+                canvas.tag_lower(tile[1])  # 静态内容在最底层，动态元素保持矢量显示在上面
+            elif key not in self.visible:
+                tk.Canvas.coords(canvas, tile[1], x, y)
+                canvas.itemconfig(tile[1], state="normal")
+        self.visible = wanted
+        # 超出内存上限时淘汰最久未使用的分块
+        limit = max(self.max_bytes // (size * size * 4), len(wanted))
+        for key in list(tiles)[:max(len(tiles) - limit, 0)]:
+            if key in wanted: continue
+            image, item = tiles.pop(key)
+            if item is not None: tk.Canvas.delete(canvas, item)
+
+    # 删除所有分块
+    def clear(self):
+        for image, item in self.tiles.values():
+            if item is not None: tk.Canvas.delete(self.canvas, item)
+        self.tiles.clear()
+        self.visible.clear()
 
 
 # 自定义画布，方便配合自定义滚轮
 class IkCanvas(tk.Canvas):
+    # 所有画布共用的默认参数，给实例赋值即可单独修改
+    zoom_min, zoom_max = 0.05, 20.0  # 缩放比例范围
+    frame_budget = 0.008  # 平滑滚动每帧的耗时预算（秒）
+    prefetch_time = 0.3  # 预加载的时长（秒），滚动方向上的边距增加 速度 * prefetch_time
+    prefetch_max = 2000  # 滚动方向上增加的边距上限
+    prefetch_items = 5000  # 同时存在的虚拟元素上限，超出时只按virtual_margin加载
+    # 可选功能的状态，用到时才在实例上创建，大量小画布不必为未使用的功能占用内存
+    _item_index: _GridIndex | None = None  # 元素的空间索引，逻辑坐标，开启spatial_index或auto_extent时创建
+    _scroll_group: "IkScrollGroup | None" = None  # 所属的同步滚动组
+    __virtual: _VirtualState | None = None  # 虚拟元素
+    _virtual_watchers: tuple = ()  # 虚拟元素的空间索引创建时的回调函数，参数为索引
+    __extent: _ExtentState | None = None  # auto_extent的内容边界
+    __static: _StaticLayer | None = None  # 静态内容的分块缓存
+    __viewport_callbacks: tuple = ()  # 视口改变后的回调函数
+    __lods: tuple[list, ...] = ()  # 细节层次：[阈值, 细节标签, 代理标签, 回调函数, 是否低于阈值]
+    __master_size: tuple[int, int] | None = None  # 最近一次扩展布局时父容器的尺寸
+
     def __init__(
             self, master,
             expand_width: bool = True,
@@ -16,12 +466,21 @@ class IkCanvas(tk.Canvas):
             wheel_step: int = 10,
             bg: str = None,
             bd: int = 0, highlightthickness: int = 0,
+            scroll_mode: str = "move",
+            debug: bool = False,
+            virtual_margin: int = 100,
+            spatial_index: bool = False,
+            coalesce: bool = False,
+            max_fps: int = 60,
+            auto_extent: bool = False,
+            style: "IkStyle" = None,
+            lazy: bool = False,
             *args, **kwargs
      ):
         """
         用grid,pack等布局时不要使用拓展参数，会出问题，若要拓展，应使用内部参数expand_width和expand_height；
         需绑定IkScroll时使用bind_scroll函数，仅支持IkScrollBar；
-        要给IkCanvas绑定事件时，需要bind里添加参数add=True，否则会覆盖原有事件。
+        内部事件由所有IkCanvas共用的类绑定处理，给IkCanvas绑定事件不会覆盖原有事件。
         :param master:   父容器
         :param expand_width:  宽度是否根据master扩展，最大不会超过canvas_width
         :param expand_height: 高度是否根据master扩展，最大不会超过canvas_height
@@ -33,59 +492,97 @@ class IkCanvas(tk.Canvas):
         :param bg:  背景色
         :param bd:  边框宽度
         :param highlightthickness: 边框宽度
+        :param scroll_mode: 滚动方式，move为移动所有元素（默认），view为在scrollregion上移动视口（xview/yview），
+            view模式下滚动开销与元素数量无关，元素直接使用画布坐标绘制即可，无需再加上已移动的距离
+        :param debug: 调试模式，每次移动后用Tk的实际坐标校验缓存的滚动状态，不一致时抛出RuntimeError
+        :param virtual_margin: 虚拟元素的预加载边距，视口外该距离内的虚拟元素也会被创建，
+            滚动时滚动方向上的边距按速度增加，见prefetch_time、prefetch_max、prefetch_items与get_prefetch_stats
+        :param spatial_index: 是否维护元素包围盒的空间索引，开启后可用items_at、items_in快速命中检测，
+            需通过本对象的create_xxx、coords、move_item、delete修改元素，用itemconfig改变元素大小后需调用update_index
+        :param coalesce: 是否合并滚动事件，开启后滚轮与IkScrollBar拖动的移动距离会累加，每帧只移动一次，总距离不变
+        :param max_fps: 合并滚动事件时每秒最多移动的次数
+        :param auto_extent: 实际画布大小是否跟随内容，开启后camvas_width、canvas_height为最小值，展示的宽高可以超过最小值，
+            画布大小随元素（含虚拟元素与静态缓存）的右下边界自动增减，会同时开启元素包围盒的跟踪，修改元素的要求同spatial_index
+        :param style: 共用的样式IkStyle，样式的bg不为None时代替bg，切换主题时统一更新
+        :param lazy: 延迟初始化，创建时不强制刷新父容器的布局，扩展的宽高在父容器第一次布局时确定，
+            此时父容器大于实际画布时不报错，而是限制为实际画布大小；在IkLayoutBatch中创建时自动开启
         """
         super().__init__(master, *args, **kwargs)
+        IkProfiler._register(self)
         if wheel_step <= 0:  # 步长必须大于0
             raise ValueError("wheel_step must be greater than 0")
+        if scroll_mode not in ["move", "view"]:
+            raise ValueError("scroll_mode must be 'move' or 'view'")
+        if max_fps <= 0:
+            raise ValueError("max_fps must be greater than 0")
+        self.scroll_mode = scroll_mode
+        self.debug = debug
         # 是否扩展
         self.expand_width, self.expand_height = expand_width, expand_height
-        master.update_idletasks()  # 刷新父容器尺寸
+        lazy = lazy or IkLayoutBatch._depth > 0
+        if not lazy: master.update_idletasks()  # 刷新父容器尺寸
+        # auto_extent时实际画布大小只是最小值，展示的宽高可以超过，画布随之变大
         if not self.expand_width:
             if show_width is ...:  # 宽度未指定
                 raise ValueError("show_width must be specified when expand_width is False")
             else:
-                if show_width > camvas_width:
+                if show_width > camvas_width and not auto_extent:
                     raise ValueError("show_width > canvas_width")
+        elif lazy:  # 扩展宽度，由父容器第一次布局决定
+            show_width = None
         else:  # 扩展宽度
             show_width = master.winfo_width()
-            if show_width > camvas_width:
+            if show_width > camvas_width and not auto_extent:
                 raise ValueError("master`s width > canvas_width")
         if not self.expand_height:
             if show_height is ...:  # 高度未指定
                 raise ValueError("show_height must be specified when expand_height is False")
             else:
-                if show_height > canvas_height:
+                if show_height > canvas_height and not auto_extent:
                     raise ValueError("show_height > canvas_height")
+        elif lazy:  # 扩展高度，由父容器第一次布局决定
+            show_height = None
         else:  # 扩展高度
             show_height = master.winfo_height()
-            if show_height > canvas_height:
+            if show_height > canvas_height and not auto_extent:
                 raise ValueError("master`s height > canvas_height")
         # 画布参数
-        if bg: self["bg"] = bg
-        else: self["bg"] = master["bg"]
-        self.config(width=show_width, height=show_height, bd=bd, highlightthickness=highlightthickness)
+        self.style = style
+        if style is not None:
+            style._register(self)
+            if style.options["bg"] is not None: bg = style.options["bg"]
+        self.config(
+            bg=bg if bg else master["bg"], width=show_width, height=show_height, bd=bd, highlightthickness=highlightthickness
+        )
+        self.__layout_size = [show_width, show_height]  # 最近一次设置的宽高，未改变时不重复config
         # 参数
         self.canvas_width = camvas_width
         self.canvas_height = canvas_height
         self.wheel_step = wheel_step
+        self.virtual_margin = virtual_margin
+        self.coalesce = coalesce
+        self.max_fps = max_fps
+        if spatial_index or auto_extent:
+            self._item_index = _GridIndex()
+        if auto_extent:
+            self.__extent = _ExtentState(camvas_width, canvas_height)
         # 定位用的矩形
-        self._locate = self.create_rectangle(0, 0, 0, 0, width=0)
+        self._locate = tk.Canvas._create(self, "rectangle", (0, 0, 0, 0), {"width": 0})
+        # 滚动状态，x、y与_locate的坐标含义相同（均为非正数），view模式下即视口偏移
+        self._state = _ScrollState()
+        if self.scroll_mode == "view":  # 视口模式由画布自己管理scrollregion
+            self.config(scrollregion=(0, 0, camvas_width, canvas_height), confine=True)
         # 当前展示的比值
         self.ratio_x = 0.0
         self.ratio_y = 0.0
-        # 底部坐标
-        self.__right: int = 0  # 右部坐标
-        self.__down: int = 0  # 底部坐标
         # 绑定事件
-        self.bind("<Configure>", self.__on_resize)   # 绑定canvas大小改变事件
-        if self.expand_width or self.expand_height:  # 绑定父容器大小改变事件
-            self.__master_bind_configure_id = self.master.bind("<Configure>", self.__on_master_resize, add=True)
-        self.bind("<MouseWheel>", self.__on_wheel)  # 绑定滚轮事件
-        self.bind("<Destroy>", self.__on_destroy)  # 绑定销毁事件
+        _bind_shared(self, "IkCanvas", IkCanvas, IkCanvas._HANDLERS)  # 大小改变、滚轮、销毁事件
+        if self.expand_width or self.expand_height:  # 跟随父容器大小改变
+            _ResizeScheduler.attach(self, layout=lazy)
         # 控件初始化
         self.y_scroll = None
         self.x_scroll = None
-        self.update_idletasks()  # 刷新父容器尺寸
+        if not lazy: self.update_idletasks()  # 刷新父容器尺寸
 
     # 绑定滚动条事件
     def bind_scroll(self, scrollbar: "IkScrollBar") -> bool:
@@ -97,6 +594,7 @@ class IkCanvas(tk.Canvas):
             raise TypeError("scrollbar must be IkScrollBar object")
         if scrollbar.orient == "v": self.y_scroll = scrollbar
         else: self.x_scroll = scrollbar
+        if scrollbar.canvas is self: scrollbar.update_slider()  # 晚于布局绑定时滑块仍是整条长度，立即重新计算
         return True
 
     @property
@@ -107,13 +605,27 @@ class IkCanvas(tk.Canvas):
         """
         return self.ratio_x, self.ratio_y
 
+    @property
+    def auto_extent(self) -> bool:
+        """
+        实际画布大小是否跟随内容，创建时指定
+        """
+        return self.__extent is not None
+
+    @property
+    def get_zoom(self) -> float:
+        """
+        获取缩放比例
+        """
+        return self._state.scale
+
     @property
     def get_count(self) -> tuple[int, int]:
         """
         获取可移动距离
         :return: (右部可移动距离, 底部可移动距离)
         """
-        return self.__right, self.__down
+        return self._state.right, self._state.down
 
     @property
     def get_moved_count(self) -> tuple[int, int]:
@@ -121,7 +633,17 @@ class IkCanvas(tk.Canvas):
         获取已移动的距离
         :return: (x移动距离, y移动距离)
         """
-        return abs(self.coords(self._locate)[0]), abs(self.coords(self._locate)[1])
+        return abs(self._state.x), abs(self._state.y)
+
+    @property
+    def get_viewport(self) -> tuple[float, float, float, float]:
+        """
+        获取视口对应的逻辑坐标范围（未滚动、未缩放时的画布坐标）
+        :return: (左, 上, 右, 下)
+        """
+        state = self._state
+        scale = state.scale
+        return -state.x / scale, -state.y / scale, (state.width - state.x) / scale, (state.height - state.y) / scale
 
     @property
     def get_leave_count(self) -> tuple[int, int]:
@@ -129,112 +651,1169 @@ class IkCanvas(tk.Canvas):
         获取剩余可移动次数
         :return: (右部可移动次数, 底部可移动次数)
         """
-        return (self.coords(self._locate)[0] + self.__right,
-                self.coords(self._locate)[1] + self.__down)
+        state = self._state
+        return state.x + state.right, state.y + state.down
 
     # 绑定canvas大小改变事件
     def __on_resize(self, event):
-        self.__right = self.canvas_width - event.width  # 右部坐标
-        self.__down = self.canvas_height - event.height  # 底部坐标
-        if self.coords(self._locate)[0] + self.__right < 0:  # 右部超出范围
-            self.move(-(self.coords(self._locate)[0] + self.__right), 0)  # 复位到右边，需要实时计算
-        if self.coords(self._locate)[1] + self.__down < 0:  # 底部超出范围
-            self.move(0, -(self.coords(self._locate)[1] + self.__down))  # 复位到底部
-
-    # 父容器大小改变事件
-    def __on_master_resize(self, event):
-        width, height = self.master.winfo_width(), self.master.winfo_height()
+        state = self._state
+        state.width, state.height = event.width, event.height
+        state.right = max(self.canvas_width - event.width, 0)  # 右部坐标
+        state.down = max(self.canvas_height - event.height, 0)  # 底部坐标
+        if state.x + state.right < 0:  # 右部超出范围
+            self.move(-(state.x + state.right), 0)  # 复位到右边，move后状态会同步更新
+        if state.y + state.down < 0:  # 底部超出范围
+            self.move(0, -(state.y + state.down))  # 复位到底部
+        for scrollbar in (self.x_scroll, self.y_scroll):  # 可移动距离改变，滑块大小随之改变
+            if scrollbar is not None and scrollbar.canvas is self:
+                scrollbar.update_slider()
+        if self.__extent is not None:  # 画布大小不小于展示的大小，随之同步
+            self.__schedule_extent()
+        self.__update_viewport()  # 视口变大时补充新露出的内容
+
+    # 父容器大小改变后的布局，由_ResizeScheduler在空闲时统一调用
+    def _master_layout(self, width, height):
+        self.__master_size = (width, height)
+        clamp = self.__extent is None  # auto_extent时实际画布随展示的大小变大，不限制扩展
         if self.expand_width:
-            if width <= self.canvas_width:  # 现宽度未超过canvas_width
-                self.config(width=width)
-            else:
+            if width > self.canvas_width and clamp:  # 现宽度超过canvas_width
                 if self.get_leave_count[0] < 0:  # 右部超出范围
-                    self.move(self.coords(self._locate)[0], 0)  # 复位到右边
-                self.config(width=self.canvas_width)
+                    self.move(self._state.x, 0)  # 复位到右边
+                width = self.canvas_width
+            if width != self.__layout_size[0]:
+                self.__layout_size[0] = width
+                self.config(width=width)
         if self.expand_height:
-            if height <= self.canvas_height:  # 现高度未超过canvas_height
-                self.config(height=height)
-            else:
+            if height > self.canvas_height and clamp:  # 现高度超过canvas_height
                 if self.get_leave_count[1] < 0:  # 底部超出范围
-                    self.move(0, self.coords(self._locate)[1])  # 复位到底部
-                self.config(height=self.canvas_height)
+                    self.move(0, self._state.y)  # 复位到底部
+                height = self.canvas_height
+            if height != self.__layout_size[1]:
+                self.__layout_size[1] = height
+                self.config(height=height)
 
     # 绑定滚轮事件
     def __on_wheel(self, event):
+        self.stop_scroll()  # 手动滚动打断平滑滚动
         wheel = self.wheel_step * event.delta / 120  # 滚动的大小
         if event.state & 1:  # 同时按下shift
-            self.move(wheel, 0)  # 水平移动
+            self.post_move(wheel, 0)  # 水平移动
         else:
-            self.move(0, wheel)  # 垂直移动
+            self.post_move(0, wheel)  # 垂直移动
 
     # 绑定销毁事件
     def __on_destroy(self, event):
+        self.stop_scroll()
+        if self._scroll_group is not None:
+            self._scroll_group.remove(self)
+        extent, state = self.__extent, self._state
+        if extent is not None and extent.after_id is not None:
+            self.after_cancel(extent.after_id)
+            extent.after_id = None
+        if state.pending_id is not None:  # 取消未执行的合并移动
+            self.after_cancel(state.pending_id)
+            state.pending_id = None
         if self.expand_width or self.expand_height:
-            self.master.unbind("<Configure>", self.__master_bind_configure_id)  # 解绑在本对象绑定的父容器大小改变事件
-        self.unbind("<Configure>")
-        self.unbind("<MouseWheel>")
-        self.unbind("<Destroy>")
+            _ResizeScheduler.detach(self)  # 注销父容器大小改变的布局
+
+    # 所有IkCanvas共用的事件处理，由_bind_shared按类绑定
+    _HANDLERS = {
+        "<Configure>": lambda widget, event: widget.__on_resize(event),  # canvas大小改变
+        "<MouseWheel>": lambda widget, event: widget.__on_wheel(event),  # 滚轮
+        "<Destroy>": lambda widget, event: widget.__on_destroy(event),
+    }
+
+    # 校验缓存的滚动状态
+    def check_state(self) -> bool:
+        """
+        用Tk的实际坐标校验缓存的滚动状态，会产生Tcl调用，仅用于调试
+        :return: 一致时返回True，否则抛出RuntimeError
+        """
+        state = self._state
+        if self.scroll_mode == "view":  # 视口按整数像素移动，允许1像素的误差
+            real_x = -self.xview()[0] * self.canvas_width
+            real_y = -self.yview()[0] * self.canvas_height
+            tolerance = 1
+        else:
+            real_x, real_y = self.coords(self._locate)[:2]
+            tolerance = 1e-6
+        if abs(real_x - state.x) > tolerance or abs(real_y - state.y) > tolerance:
+            raise RuntimeError(f"滚动状态不一致：缓存({state.x}, {state.y})，实际({real_x}, {real_y})")
+        return True
+
+    # 逻辑坐标到画布坐标的偏移
+    def _canvas_offset(self) -> tuple[float, float]:
+        """
+        move模式下为定位坐标，view模式下元素不移动，偏移为0
+        """
+        if self.scroll_mode == "view": return 0.0, 0.0
+        return self._state.x, self._state.y
+
+    # 逻辑坐标转为画布坐标，coords为扁平的坐标序列
+    def _to_canvas(self, coords) -> list:
+        off_x, off_y = self._canvas_offset()
+        scale = self._state.scale
+        coords = list(coords)
+        if scale != 1 or off_x or off_y:
+            coords[0::2] = [c * scale + off_x for c in coords[0::2]]
+            coords[1::2] = [c * scale + off_y for c in coords[1::2]]
+        return coords
+
+    # 画布坐标转为逻辑坐标，coords为扁平的坐标序列
+    def _to_logical(self, coords) -> list:
+        off_x, off_y = self._canvas_offset()
+        scale = self._state.scale
+        coords = list(coords)
+        if scale != 1 or off_x or off_y:
+            coords[0::2] = [(c - off_x) / scale for c in coords[0::2]]
+            coords[1::2] = [(c - off_y) / scale for c in coords[1::2]]
+        return coords
+
+    # 平移内容，move模式移动所有元素，view模式只移动视口
+    def __shift(self, x, y):
+        state = self._state
+        if self.scroll_mode == "view":
+            if x:
+                # 视口受scrollregion限制，偏移也限制在可移动范围内，保证与实际视口一致
+                state.x = min(max(state.x + x, -state.right), 0)
+                self.xview_moveto(-state.x / self.canvas_width)
+            if y:
+                state.y = min(max(state.y + y, -state.down), 0)
+                self.yview_moveto(-state.y / self.canvas_height)
+        else:
+            super().move("all", x, y)
+            state.x += x
+            state.y += y
 
     # 计算比值
     def __calc(self) -> tuple[float, float]:
         _x, _y = 1.0, 1.0
-        if self.__right != 0:
-            _x = abs(self.coords(self._locate)[0] / self.__right)
+        state = self._state
+        if state.right != 0:
+            _x = abs(state.x / state.right)
             if _x >= 1: _x = 1.0
-        if self.__down != 0:
-            _y = abs(self.coords(self._locate)[1] / self.__down)
+        if state.down != 0:
+            _y = abs(state.y / state.down)
             if _y >= 1: _y = 1.0
         self.ratio_x, self.ratio_y = _x, _y
         return _x, _y
 
     # 移动
     def move(self,  x, y):
-        if self.__right == 0 and x > 0: return  # 展示的画布与实际画布相等，不用移动
-        if self.__down == 0 and y > 0: return  # 展示的画布与实际画布相等，不用移动
-        locate = self.coords(self._locate)
+        group = self._scroll_group
+        if group is not None and not group._applying:  # 联动的方向交给滚动组统一移动
+            axes = group._members[self]
+            group_x, group_y = (x if "x" in axes else 0), (y if "y" in axes else 0)
+            if group_x or group_y:
+                group._post(self, group_x, group_y)
+                x, y = x - group_x, y - group_y
+                if not x and not y: return
+        state = self._state
+        old_x, old_y = state.x, state.y
+        if state.right == 0 and x > 0: return  # 展示的画布与实际画布相等，不用移动
+        if state.down == 0 and y > 0: return  # 展示的画布与实际画布相等，不用移动
         # 到顶了且向上移动
-        if locate[1] >= 0 and y > 0:
-            super().move("all", 0, -locate[1])
+        if state.y >= 0 and y > 0:
+            self.__shift(0, -state.y)
         # 到底了且向下移动
-        elif locate[1] + y <= -self.__down and y < 0:
-            super().move("all", 0, -(locate[1] + self.__down))
+        elif state.y + y <= -state.down and y < 0:
+            self.__shift(0, -(state.y + state.down))
         # 到左边了且向左移动
-        elif locate[0] >= 0 and x > 0:
-            super().move("all", -locate[0], 0)
+        elif state.x >= 0 and x > 0:
+            self.__shift(-state.x, 0)
         # 到右边了且向右移动
-        elif locate[0] + x <= -self.__right and x < 0:
-            super().move("all", -(locate[0] + self.__right), 0)
+        elif state.x + x <= -state.right and x < 0:
+            self.__shift(-(state.x + state.right), 0)
         # 正常移动
-        else: super().move("all", x, y)
+        else: self.__shift(x, y)
+        self.__track_velocity(old_x - state.x, old_y - state.y)
         self.__calc()
+        if self.debug: self.check_state()
+        self.__update_viewport()
         if self.y_scroll:  # 已绑定y滚动条
             try:
                 if self.y_scroll.canvas is self:  # 已绑定本画布
-                    self.y_scroll.move_slider(0, -self.coords(self._locate)[1])  # 移动滑块
+                    self.y_scroll.move_slider(0, -state.y)  # 移动滑块
             except AttributeError:  # 没有.canvas属性，说明还没绑定画布
                 raise ValueError("y_scroll 未绑定本画布")
         if self.x_scroll:
             try:
                 if self.x_scroll.canvas is self:  # 已绑定本画布
-                    self.x_scroll.move_slider(-self.coords(self._locate)[0], 0)  # 移动滑块
+                    self.x_scroll.move_slider(-state.x, 0)  # 移动滑块
             except AttributeError:  # 没有.canvas属性，说明还没绑定画布
                 raise ValueError("x_scroll 未绑定本画布")
 
+    # 用指数移动平均估计滚动速度
+    def __track_velocity(self, dx, dy):
+        now, state = time.perf_counter(), self._state
+        if dx:
+            state.vx = self.__smooth_velocity(state.vx, now - state.vx_time, dx)
+            state.vx_time = now
+        if dy:
+            state.vy = self.__smooth_velocity(state.vy, now - state.vy_time, dy)
+            state.vy_time = now
+
+    # 一个方向上的速度估计
+    def __smooth_velocity(self, velocity, elapsed, delta) -> float:
+        if elapsed > 0.2:  # 停顿后重新开始，按一帧的间隔估计
+            return delta * self.max_fps
+        return velocity * 0.5 + delta / max(elapsed, 0.001) * 0.5
+
+    @property
+    def get_velocity(self) -> tuple[float, float]:
+        """
+        获取估计的滚动速度（像素/秒），正数表示向右、向下滚动，停止滚动0.2秒后为0
+        :return: (x速度, y速度)
+        """
+        now, state = time.perf_counter(), self._state
+        return 0.0 if now - state.vx_time > 0.2 else state.vx, 0.0 if now - state.vy_time > 0.2 else state.vy
+
+    # 按滚动速度计算四个方向的预加载边距
+    def _prefetch_margins(self, base) -> tuple[float, float, float, float]:
+        """
+        滚动方向上的边距增加 速度 * prefetch_time，最多增加prefetch_max，单位为窗口像素
+        :param base: 基础边距
+        :return: (左, 上, 右, 下)
+        """
+        margins = [base, base, base, base]
+        for axis, speed in enumerate(self.get_velocity):
+            if speed:
+                margins[axis + 2 if speed > 0 else axis] += min(abs(speed) * self.prefetch_time, self.prefetch_max)
+        return margins[0], margins[1], margins[2], margins[3]
+
+    # 预加载统计
+    def get_prefetch_stats(self) -> dict:
+        """
+        虚拟元素进入视口时已预先创建记为命中，否则记为未命中
+        :return: {"hits": 命中数, "misses": 未命中数, "hit_rate": 命中率, "margins": 当前的预加载边距}
+        """
+        virtual = self.__virtual
+        hits, misses = (0, 0) if virtual is None else (virtual.hits, virtual.misses)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "margins": self._prefetch_margins(self.virtual_margin),
+        }
+
+    # 清空预加载统计
+    def reset_prefetch_stats(self):
+        if self.__virtual is not None:
+            self.__virtual.hits, self.__virtual.misses = 0, 0
+
+    # 投递移动
+    def post_move(self, x, y):
+        """
+        coalesce开启时累加移动距离，下一帧统一移动，否则立即移动；滚轮和IkScrollBar拖动都通过此函数移动画布
+        :param x: x移动距离
+        :param y: y移动距离
+        """
+        if not self.coalesce:
+            self.move(x, y)
+            return
+        state = self._state
+        state.pending_x += x
+        state.pending_y += y
+        if state.pending_id is None:
+            state.pending_id = self.after(max(int(1000 / self.max_fps), 1), self.__flush_move)
+
+    # 立即执行未执行的合并移动，动画从移动后的位置开始
+    def __apply_pending(self):
+        state = self._state
+        if state.pending_id is not None:
+            self.after_cancel(state.pending_id)
+            self.__flush_move()
+
+    # 执行累加的移动
+    def __flush_move(self):
+        state = self._state
+        x, y = state.pending_x, state.pending_y
+        state.pending_x, state.pending_y = 0.0, 0.0
+        state.pending_id = None
+        # move每次只处理一个方向的边界，分开移动
+        if x: self.move(x, 0)
+        if y: self.move(0, y)
+
+    # 视口改变后更新依赖视口的内容
+    def __update_viewport(self):
+        virtual = self.__virtual
+        if virtual is not None:
+            virtual.window = None  # 视口已改变
+            if virtual.items: self.__update_virtual()
+        if self.__static is not None:
+            state = self._state
+            self.__static.update(-state.x, -state.y, -state.x + state.width, -state.y + state.height)
+        self._on_viewport()
+        for func in self.__viewport_callbacks:  # 元组不可变，回调中移除自身不影响本次遍历
+            func(self)
+
+    # 样式改变后要执行的Tcl命令，由IkStyle在空闲时合并执行
+    def _style_script(self, style: "IkStyle") -> list[str]:
+        bg = style.options["bg"]
+        return [] if bg is None else [f"{self._w} configure -background {tk._stringify(bg)}"]
+
+    # 视口改变后的扩展点，子类重写以绘制依赖视口的内容
+    def _on_viewport(self):
+        pass
+
+    # 添加视口回调
+    def add_viewport_callback(self, func):
+        """
+        视口改变（滚动、大小改变、缩放、画布大小改变）后调用，参数为本画布，可用get_viewport获取视口范围
+        :param func: 回调函数
+        """
+        if not callable(func):
+            raise TypeError("func must be callable")
+        self.__viewport_callbacks += (func,)
+
+    # 移除视口回调
+    def remove_viewport_callback(self, func) -> bool:
+        """
+        :return: 存在并移除返回True，否则返回False
+        """
+        if func not in self.__viewport_callbacks: return False
+        callbacks = list(self.__viewport_callbacks)
+        callbacks.remove(func)
+        self.__viewport_callbacks = tuple(callbacks)
+        return True
+
+    # 缓存静态内容
+    def cache_static(self, tagOrId, tile_size: int = 256, max_bytes: int = 64 * 1024 * 1024) -> int:
+        """
+        把标签下的静态元素（网格、背景等）光栅化为PhotoImage分块，删除原矢量元素，滚动时只显示视口内的分块；
+        目前支持实心或带轮廓的矩形、水平或垂直的直线，其余元素（文本、斜线、虚线等）保持矢量不变；
+        分块显示在最底层，可多次调用追加内容，已缓存的分块会重新绘制
+        :param tagOrId: 静态元素的id或标签
+        :param tile_size: 分块边长，首次调用时有效
+        :param max_bytes: 分块缓存的内存上限（按每像素4字节估算），超出后淘汰最久未使用的分块
+        :return: 光栅化的元素数量
+        """
+        if self.__static is None:
+            if tile_size <= 0:
+                raise ValueError("tile_size must be greater than 0")
+            self.__static = _StaticLayer(self, tile_size, max_bytes)
+        static = self.__static
+        static.max_bytes = max_bytes
+        items = [item for item in self.find_withtag(tagOrId) if item != self._locate]
+        converted = []
+        for item in items:
+            shapes = static.extract(item)
+            if shapes is not None:
+                static.add(shapes)
+                for shape in shapes:
+                    self.__extent_add(shape[3], shape[4])
+                converted.append(item)
+        if converted:
+            self.delete(*converted)
+            static.clear()  # 内容改变，重新绘制
+            self.__update_viewport()
+        return len(converted)
+
+    # 清除静态内容缓存
+    def clear_static_cache(self):
+        """
+        删除cache_static生成的全部分块及其内容
+        """
+        if self.__static is not None:
+            self.__static.clear()
+            self.__static = None
+
+    # 创建虚拟元素
+    def create_virtual(self, kind: str, *coords, bbox=None, **options) -> int:
+        """
+        创建虚拟元素，只登记描述，进入视口（含virtual_margin）时才创建真实的Tk元素，离开视口后隐藏回收，供后续元素复用；
+        坐标为逻辑坐标，即未滚动时的画布坐标，move模式下无需加上已移动的距离；
+        text、image、bitmap、window只有锚点坐标，未指定bbox时先按锚点登记，第一次创建Tk元素后按实际大小更新，
+        长文本或锚点不在左上角的元素应指定bbox，否则锚点离开视口后元素可能提前消失或延迟出现
+        :param kind: 元素类型，如rectangle、oval、line、polygon、text、image
+        :param coords: 坐标，与create_xxx相同
+        :param bbox: 元素的包围盒(x0, y0, x1, y1)，逻辑坐标，None则按坐标计算
+        :param options: 元素参数，与create_xxx相同
+        :return: 虚拟元素id
+        """
+        virtual = self.__virtual_state()
+        return self.__add_virtual(virtual, kind, coords, options, bbox, self.__current_window(virtual))
+
+    # 批量创建虚拟元素
+    def create_virtual_many(self, items) -> list[int]:
+        """
+        批量创建虚拟元素，视口范围只计算一次，登记时只判断新元素是否在视口内，不重新查询已有的虚拟元素
+        :param items: 可迭代的(元素类型, 坐标, 元素参数)或(元素类型, 坐标, 元素参数, 包围盒)，含义同create_virtual
+        :return: 虚拟元素id，与items顺序一致
+        """
+        virtual = self.__virtual_state()
+        window = self.__current_window(virtual)
+        vids = []
+        for kind, coords, options, *bbox in items:
+            vids.append(self.__add_virtual(virtual, kind, tuple(coords), options, bbox[0] if bbox else None, window))
+        return vids
+
+    # 虚拟元素的状态，第一次使用时创建
+    def __virtual_state(self) -> _VirtualState:
+        if self.__virtual is None:
+            self.__virtual = _VirtualState()
+            watchers, self._virtual_watchers = self._virtual_watchers, ()
+            for func in watchers:
+                func(self.__virtual.index)
+        return self.__virtual
+
+    @property
+    def _virtual_index(self) -> _GridIndex | None:
+        """
+        虚拟元素的空间索引，逻辑坐标，未使用虚拟元素时为None
+        """
+        return None if self.__virtual is None else self.__virtual.index
+
+    # 登记虚拟元素，包围盒与需要创建的范围相交时直接创建Tk元素
+    def __add_virtual(self, virtual: _VirtualState, kind: str, coords, options: dict, bbox, window) -> int:
+        coords = tuple(map(float, tk._flatten(coords)))
+        if len(coords) < 2 or len(coords) % 2:
+            raise ValueError("coords must be pairs of x, y")
+        if bbox is not None:
+            if len(bbox) != 4:
+                raise ValueError("bbox must be (x0, y0, x1, y1)")
+            x0, y0, x1, y1 = map(float, bbox)
+            if x0 > x1: x0, x1 = x1, x0
+            if y0 > y1: y0, y1 = y1, y0
+        else:
+            xs, ys = coords[0::2], coords[1::2]
+            x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+        vid = virtual.next
+        virtual.next += 1
+        item = virtual.items[vid] = _VirtualItem(kind, coords, options)
+        virtual.index.insert(vid, x0, y0, x1, y1)
+        if bbox is None and kind in ["text", "image", "window", "bitmap"]:  # 大小取决于内容，创建Tk元素后再测量
+            virtual.unmeasured.add(vid)
+        self.__extent_add(x1, y1)
+        wanted, visible = window
+        if x0 <= wanted[2] and x1 >= wanted[0] and y0 <= wanted[3] and y1 >= wanted[1]:
+            self.__show_virtual(item)
+            virtual.shown.add(vid)
+            if vid in virtual.unmeasured:
+                x0, y0, x1, y1 = self.__measure_virtual(virtual, vid, item)
+            if x0 <= visible[2] and x1 >= visible[0] and y0 <= visible[3] and y1 >= visible[1]:
+                virtual.visible.add(vid)  # 创建时已在视口内，不计入预加载统计
+        return vid
+
+    # 删除虚拟元素
+    def delete_virtual(self, vid: int) -> bool:
+        """
+        删除虚拟元素，已创建的Tk元素会被回收
+        :param vid: 虚拟元素id
+        :return: 删除成功返回True，不存在返回False
+        """
+        virtual = self.__virtual
+        item = None if virtual is None else virtual.items.pop(vid, None)
+        if item is None: return False
+        self.__extent_remove(virtual.index.bbox(vid))
+        virtual.index.remove(vid)
+        virtual.visible.discard(vid)
+        virtual.unmeasured.discard(vid)
+        if vid in virtual.shown:
+            virtual.shown.discard(vid)
+            self.__hide_virtual(item)
+        return True
+
+    # 获取虚拟元素对应的Tk元素
+    def virtual_item(self, vid: int) -> int | None:
+        """
+        :param vid: 虚拟元素id
+        :return: 已创建的Tk元素id，虚拟元素不在视口内时返回None
+        """
+        item = None if self.__virtual is None else self.__virtual.items.get(vid)
+        return None if item is None else item.item
+
+    # 刷新虚拟元素
+    def update_virtual(self):
+        """
+        按当前视口重新计算需要创建的虚拟元素，修改virtual_margin后可调用
+        """
+        if self.__virtual is not None:
+            self.__update_virtual()
+
+    # 需要创建Tk元素的范围与视口范围，均为逻辑坐标(左, 上, 右, 下)
+    def __virtual_window(self, prefetch: bool) -> tuple[tuple, tuple]:
+        """
+        :param prefetch: 是否按滚动速度增加边距
+        """
+        state, margin = self._state, self.virtual_margin
+        left, top = -state.x, -state.y
+        right, bottom = left + state.width, top + state.height
+        scale = state.scale
+        if prefetch: margin_l, margin_t, margin_r, margin_b = self._prefetch_margins(margin)
+        else: margin_l = margin_t = margin_r = margin_b = margin
+        wanted = (
+            (left - margin_l) / scale, (top - margin_t) / scale, (right + margin_r) / scale, (bottom + margin_b) / scale
+        )
+        return wanted, (left / scale, top / scale, right / scale, bottom / scale)
+
+    # 最近一次刷新虚拟元素时使用的范围，视口改变前新登记的虚拟元素都按此范围判断
+    def __current_window(self, virtual: _VirtualState) -> tuple[tuple, tuple]:
+        if virtual.window is None:
+            virtual.window = self.__virtual_window(True)
+        return virtual.window
+
+    def __update_virtual(self):
+        virtual = self.__virtual
+        index = virtual.index
+        window = self.__virtual_window(True)
+        wanted = index.query(*window[0])
+        if len(wanted) > self.prefetch_items:  # 超出上限，放弃按速度预加载
+            window = self.__virtual_window(False)
+            wanted = index.query(*window[0])
+        virtual.window = window
+        shown, items = virtual.shown, virtual.items
+        # 统计新进入视口的虚拟元素是否已预先创建
+        visible = index.query(*window[1])
+        for vid in visible - virtual.visible:
+            if vid in shown: virtual.hits += 1
+            else: virtual.misses += 1
+        virtual.visible = visible
+        for vid in shown - wanted:
+            self.__hide_virtual(items[vid])
+        unmeasured = virtual.unmeasured
+        for vid in wanted - shown:
+            self.__show_virtual(items[vid])
+            if vid in unmeasured: self.__measure_virtual(virtual, vid, items[vid])
+        virtual.shown = wanted
+
+    # 为虚拟元素创建或复用Tk元素
+    def __show_virtual(self, item: _VirtualItem):
+        coords = self._to_canvas(item.coords)
+        pool = self.__virtual.pool.get((item.kind, tuple(sorted(item.options))))
+        if pool:
+            item.item = pool.pop()
+            tk.Canvas.coords(self, item.item, *coords)
+            self.itemconfig(item.item, **{"state": "normal", **item.options})
+        else:  # 虚拟元素有自己的索引，不登记到元素索引中
+            item.item = tk.Canvas._create(self, item.kind, coords, item.options)
+
+    # 按Tk元素的实际大小更新只有锚点坐标的虚拟元素的包围盒
+    def __measure_virtual(self, virtual: _VirtualState, vid: int, item: _VirtualItem) -> tuple:
+        virtual.unmeasured.discard(vid)
+        old = virtual.index.bbox(vid)
+        box = tk.Canvas.bbox(self, item.item)
+        if not box: return old  # 空文本等没有大小
+        x0, y0, x1, y1 = self._to_logical(box)
+        virtual.index.insert(vid, x0, y0, x1, y1)
+        self.__extent_remove(old)
+        self.__extent_add(x1, y1)
+        return x0, y0, x1, y1
+
+    # 隐藏并回收虚拟元素的Tk元素
+    def __hide_virtual(self, item: _VirtualItem):
+        key = (item.kind, tuple(sorted(item.options)))
+        pool = self.__virtual.pool.setdefault(key, [])
+        if len(pool) < 1024:  # 回收池上限，超出直接删除
+            self.itemconfig(item.item, state="hidden")
+            pool.append(item.item)
+        else:
+            self.delete(item.item)
+        item.item = None
+
+    # 创建元素，开启空间索引时登记包围盒
+    def _create(self, itemType, args, kw):
+        item = super()._create(itemType, args, kw)
+        if self._item_index is not None:
+            args = tk._flatten(args)
+            cnf = {}
+            if args and isinstance(args[-1], (dict, tuple)):
+                cnf, args = args[-1], args[:-1]
+            options = {**cnf, **kw} if isinstance(cnf, dict) else kw
+            self.__index_created(itemType, (item,), args, len(args), options.get("width", 1))
+        return item
+
+    # 登记新建元素的包围盒，coords为各元素依次排列的画布坐标，每个元素stride个
+    def __index_created(self, kind: str, items, coords, stride: int, width):
+        if kind in ["text", "image", "window", "bitmap"] or stride < 4:  # 大小取决于内容，只能向Tk查询
+            self.__index_items(items)
+            return
+        # 轮廓线宽度会超出坐标范围，宽度可以是"2p"、"1m"等屏幕距离，数值以外的交给Tk换算
+        half = (width if isinstance(width, (int, float)) else self.winfo_fpixels(width)) / 2
+        off_x, off_y = self._canvas_offset()
+        scale = self._state.scale
+        insert = self._item_index.insert
+        right = bottom = 0.0
+        for number, item in enumerate(items):
+            part = coords[number * stride:(number + 1) * stride]
+            xs, ys = part[0::2], part[1::2]
+            x1, y1 = (max(xs) - off_x + half) / scale, (max(ys) - off_y + half) / scale
+            insert(item, (min(xs) - off_x - half) / scale, (min(ys) - off_y - half) / scale, x1, y1)
+            if x1 > right: right = x1
+            if y1 > bottom: bottom = y1
+        self.__extent_add(right, bottom)
+
+    # 批量创建元素
+    def create_many(self, kind: str, coords, stride: int = None, texts=None, chunk: int = 5000, **options) -> list[int]:
+        """
+        批量创建同一类型的元素，每chunk个元素只执行一次Tcl脚本，比逐个调用create_xxx快得多；
+        坐标为逻辑坐标（未滚动时的画布坐标），move模式下会自动加上已移动的距离，与滚动后的内容对齐
+        :param kind: 元素类型，如rectangle、oval、line、polygon、text、image
+        :param coords: 扁平的坐标序列，如[x0, y0, x1, y1, x0, y0, x1, y1, ...]，缩放后会乘以缩放比例，支持list、array('d')和NumPy数组
+        :param stride: 每个元素的坐标数，rectangle、oval、arc、line默认为4，text、image、window、bitmap默认为2，polygon必须指定
+        :param texts: kind为text时每个元素的文本，数量需与元素数量相同
+        :param chunk: 每次执行的元素数量
+        :param options: 所有元素共用的参数，与create_xxx相同
+        :return: 元素id，与坐标顺序一致
+        """
+        if stride is None:
+            if kind in ["rectangle", "oval", "arc", "line"]: stride = 4
+            elif kind in ["text", "image", "window", "bitmap"]: stride = 2
+            else: raise ValueError(f"{kind}需要指定stride")
+        if stride < 2 or stride % 2:
+            raise ValueError("stride must be a positive even number")
+        if chunk <= 0:
+            raise ValueError("chunk must be greater than 0")
+        coords = coords.tolist() if hasattr(coords, "tolist") else list(coords)  # NumPy数组和array转为list更快
+        if len(coords) % stride:
+            raise ValueError("len(coords) must be a multiple of stride")
+        count = len(coords) // stride
+        if texts is not None and len(texts) != count:
+            raise ValueError("len(texts) must be equal to the number of items")
+        coords = self._to_canvas(coords)
+        shared = " ".join(tk._stringify(value) for value in self._options(options))
+        head = f"[{self._w} create {kind} "
+        items: list[int] = []
+        for begin in range(0, count, chunk):
+            parts = ["list"]
+            for number in range(begin, min(begin + chunk, count)):
+                part = " ".join(repr(float(c)) for c in coords[number * stride:(number + 1) * stride])
+                if texts is not None:
+                    part += " -text " + tk._stringify(str(texts[number]))
+                parts.append(f"{head}{part} {shared}]")
+            items += [int(item) for item in self.tk.splitlist(self.tk.eval(" ".join(parts)))]
+        if self._item_index is not None:
+            self.__index_created(kind, items, coords, stride, options.get("width", 1))
+        return items
+
+    # 修改元素坐标，开启空间索引时更新包围盒
+    def coords(self, *args):
+        result = super().coords(*args)
+        if self._item_index is not None and len(args) > 1:
+            self.__index_items(self.__indexed_items(args[0]))
+        return result
+
+    # 删除元素，开启空间索引时移除包围盒
+    def delete(self, *args):
+        if self._item_index is None:
+            super().delete(*args)
+            return
+        items = [item for tag in args for item in self.__indexed_items(tag)]
+        super().delete(*args)
+        for item in items:
+            self.__extent_remove(self._item_index.bbox(item))
+            self._item_index.remove(item)
+
+    # 移动元素
+    def move_item(self, tagOrId, x, y):
+        """
+        移动指定元素，IkCanvas的move用于滚动整个画布，移动单个元素需用此函数
+        :param tagOrId: 元素id或标签
+        :param x: x移动距离
+        :param y: y移动距离
+        """
+        super().move(tagOrId, x, y)
+        if self._item_index is not None:
+            for item in self.__indexed_items(tagOrId):
+                self.__extent_remove(self._item_index.bbox(item))
+                self._item_index.move(item, x / self._state.scale, y / self._state.scale)
+                box = self._item_index.bbox(item)
+                self.__extent_add(box[2], box[3])
+
+    # 重新登记元素包围盒
+    def update_index(self, tagOrId="all"):
+        """
+        用Tk的实际包围盒刷新空间索引，通过itemconfig改变了元素大小（如文本、线宽）后调用
+        :param tagOrId: 元素id或标签
+        """
+        if self._item_index is None:
+            raise ValueError("spatial_index未开启")
+        self.__index_items(self.__indexed_items(tagOrId))
+
+    # 获取已登记到索引中的元素
+    def __indexed_items(self, tagOrId) -> tuple[int, ...]:
+        index = self._item_index
+        if isinstance(tagOrId, int) or (isinstance(tagOrId, str) and tagOrId.isdigit()):
+            return (int(tagOrId),) if int(tagOrId) in index else ()
+        return tuple(item for item in self.find_withtag(tagOrId) if item in index)
+
+    # 向Tk查询包围盒并登记
+    def __index_items(self, items):
+        index = self._item_index
+        for item in items:
+            self.__extent_remove(index.bbox(item))
+            box = self.bbox(item)
+            if box is None:  # 空文本等没有包围盒
+                index.insert(item, 0, 0, 0, 0)
+            else:
+                box = self._to_logical(box)
+                index.insert(item, *box)
+                self.__extent_add(box[2], box[3])
+
+    # 内部使用的Tk元素，快照不保存也不清除
+    def __internal_items(self) -> set[int]:
+        internal = {self._locate}
+        virtual = self.__virtual
+        if virtual is not None:
+            for item in virtual.items.values():
+                if item.item is not None: internal.add(item.item)
+            for pool in virtual.pool.values():
+                internal.update(pool)
+        for tag in _INTERNAL_TAGS:
+            internal.update(tk.Canvas.find_withtag(self, tag))
+        return internal
+
+    # 保存场景快照
+    def save_scene(self, path, tagOrId="all", virtual: bool = True) -> int:
+        """
+        把元素、虚拟元素与滚动状态保存为紧凑的二进制文件，不使用pickle，用load_scene恢复；
+        元素类型、坐标数、坐标按列连续存放，坐标为逻辑坐标，参数只保存与默认值不同的项且相同的参数组合只存一份；
+        image元素只保存图片名，恢复前需保证图片仍存在，window元素与内部元素（静态缓存分块等）不保存
+        :param path: 文件路径
+        :param tagOrId: 要保存的元素id或标签
+        :param virtual: 是否同时保存虚拟元素
+        :return: 保存的元素数量
+        """
+        kinds, flags = array.array("B"), array.array("B")  # 类型序号，1表示虚拟元素
+        counts, option_ids, text_ids = array.array("I"), array.array("I"), array.array("i")
+        coords = array.array("d")
+        option_sets: dict[str, int] = {}  # 参数组合的JSON -> 序号
+        options_list, texts = [], []
+
+        def add(kind, flag, points, options):
+            text = options.pop("text", None)
+            key = json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+            if key not in option_sets:
+                option_sets[key] = len(options_list)
+                options_list.append(json.loads(key))
+            kinds.append(_SCENE_KINDS.index(kind))
+            flags.append(flag)
+            counts.append(len(points))
+            option_ids.append(option_sets[key])
+            if text is None: text_ids.append(-1)
+            else:
+                text_ids.append(len(texts))
+                texts.append(str(text))
+            coords.extend(points)
+
+        internal = self.__internal_items()
+        for item in tk.Canvas.find_withtag(self, tagOrId):
+            if item in internal: continue
+            kind = tk.Canvas.type(self, item)
+            if kind not in _SCENE_KINDS: continue
+            options = {}
+            for name, value in tk.Canvas.itemconfigure(self, item).items():
+                current, default = (tk._stringify(v) if isinstance(v, tuple) else str(v) for v in value[-1:-3:-1])
+                if current != default: options[name] = current  # 与默认值相同的不保存
+            add(kind, 0, self._to_logical(tk.Canvas.coords(self, item)), options)
+        if virtual and self.__virtual is not None:
+            for item in self.__virtual.items.values():
+                if item.kind in _SCENE_KINDS: add(item.kind, 1, item.coords, dict(item.options))
+        strings = json.dumps({"options": options_list, "texts": texts}, ensure_ascii=False).encode("utf-8")
+        state = self._state
+        header = _SCENE_HEADER.pack(
+            _SCENE_MAGIC, _SCENE_VERSION, len(kinds), len(coords), len(strings), 0,
+            -state.x, -state.y, self.ratio_x, self.ratio_y, state.scale, self.canvas_width, self.canvas_height
+        )
+        with open(path, "wb") as file:
+            file.write(header)
+            for column in (kinds, flags, counts, option_ids, text_ids, coords):
+                file.write(_column_bytes(column))
+            file.write(strings)
+        return len(kinds)
+
+    # 恢复场景快照
+    def load_scene(self, path, clear: bool = False, chunk: int = 5000) -> list[int]:
+        """
+        从save_scene保存的文件恢复元素、虚拟元素、缩放比例、画布大小与滚动位置；
+        文件以内存映射方式读取，元素按chunk分批用一次Tcl脚本创建，开启空间索引时同时登记包围盒
+        :param path: 文件路径
+        :param clear: 是否先删除现有的元素与虚拟元素（内部元素除外）
+        :param chunk: 每次执行的元素数量
+        :return: 创建的元素id（不含虚拟元素），与保存时的顺序一致
+        """
+        if chunk <= 0:
+            raise ValueError("chunk must be greater than 0")
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < _SCENE_HEADER.size:
+                raise ValueError("不是IkCanvas场景文件")
+            magic, version, count, total, size, _, moved_x, moved_y, _, _, scale, width, height = \
+                _SCENE_HEADER.unpack_from(data)
+            if magic != _SCENE_MAGIC:
+                raise ValueError("不是IkCanvas场景文件")
+            if version != _SCENE_VERSION:
+                raise ValueError(f"不支持的场景文件版本：{version}")
+            offset = _SCENE_HEADER.size
+            kinds, offset = _column_from("B", data, offset, count)
+            flags, offset = _column_from("B", data, offset, count)
+            counts, offset = _column_from("I", data, offset, count)
+            option_ids, offset = _column_from("I", data, offset, count)
+            text_ids, offset = _column_from("i", data, offset, count)
+            coords, offset = _column_from("d", data, offset, total)
+            strings = json.loads(data[offset:offset + size].decode("utf-8"))
+        if clear:
+            internal = self.__internal_items()
+            items = [item for item in tk.Canvas.find_all(self) if item not in internal]
+            if items: self.delete(*items)
+            if self.__virtual is not None:
+                for vid in list(self.__virtual.items):
+                    self.delete_virtual(vid)
+        self.stop_scroll()
+        if scale != self._state.scale: self.set_zoom(scale)
+        self.set_canvas_size(width, height)
+        options_list, texts = strings["options"], strings["texts"]
+        option_strings = [" ".join(tk._stringify(value) for value in self._options(options)) for options in options_list]
+        canvas_coords = self._to_canvas(coords)
+        items: list[int] = []
+        created = []  # 创建的Tk元素：(类型, 坐标, 线宽)，用于登记包围盒
+        virtual = []  # 虚拟元素：(类型, 坐标, 参数)，最后一起登记
+        parts = ["list"]
+        position = 0
+        for number in range(count):
+            kind, length = _SCENE_KINDS[kinds[number]], counts[number]
+            points = slice(position, position + length)
+            position += length
+            text = texts[text_ids[number]] if text_ids[number] >= 0 else None
+            if flags[number]:  # 虚拟元素
+                options = dict(options_list[option_ids[number]])
+                if text is not None: options["text"] = text
+                virtual.append((kind, coords[points], options))
+                continue
+            part = " ".join(repr(c) for c in canvas_coords[points])
+            if text is not None: part += " -text " + tk._stringify(text)
+            parts.append(f"[{self._w} create {kind} {part} {option_strings[option_ids[number]]}]")
+            created.append((kind, canvas_coords[points], options_list[option_ids[number]].get("width", 1)))
+            if len(parts) > chunk:
+                items += [int(item) for item in self.tk.splitlist(self.tk.eval(" ".join(parts)))]
+                parts = ["list"]
+        if len(parts) > 1:
+            items += [int(item) for item in self.tk.splitlist(self.tk.eval(" ".join(parts)))]
+        if self._item_index is not None:  # 连续的同类型、同坐标数、同线宽的元素一起登记
+            begin = 0
+            for end in range(1, len(created) + 1):
+                if end < len(created) and created[end][0] == created[begin][0] \
+                        and len(created[end][1]) == len(created[begin][1]) and created[end][2] == created[begin][2]:
+                    continue
+                kind, points, line = created[begin]
+                run = [c for record in created[begin:end] for c in record[1]]
+                self.__index_created(kind, items[begin:end], run, len(points), line)
+                begin = end
+        self.scroll_to(moved_x, moved_y, duration=0)
+        if virtual: self.create_virtual_many(virtual)  # 滚动到保存的位置后再登记，只创建视口附近的元素
+        return items
+
+    # 内容边界可能变大
+    def __extent_add(self, right, bottom):
+        extent = self.__extent
+        if extent is None: return
+        if right > extent.right or bottom > extent.bottom:
+            extent.right, extent.bottom = max(extent.right, right), max(extent.bottom, bottom)
+            self.__schedule_extent()
+
+    # 内容边界可能变小，只有移除的包围盒位于边界上时才需要重新统计
+    def __extent_remove(self, box):
+        extent = self.__extent
+        if extent is None or box is None: return
+        if box[2] >= extent.right or box[3] >= extent.bottom:
+            extent.dirty = True
+            self.__schedule_extent()
+
+    # 合并一次空闲周期内的所有边界变化
+    def __schedule_extent(self):
+        extent = self.__extent
+        if extent.after_id is None:
+            extent.after_id = self.after_idle(self.__sync_extent)
+
+    # 按内容边界更新画布大小
+    def __sync_extent(self):
+        extent = self.__extent
+        extent.after_id = None
+        if extent.dirty:  # 只遍历Python侧的包围盒，不向Tk查询
+            extent.dirty = False
+            right = bottom = 0.0
+            indexes = [self._item_index]
+            if self.__virtual is not None: indexes.append(self.__virtual.index)
+            if self.__static is not None: indexes.append(self.__static.index)
+            for index in indexes:
+                for box in index._boxes.values():
+                    if box[2] > right: right = box[2]
+                    if box[3] > bottom: bottom = box[3]
+            extent.right, extent.bottom = right, bottom
+        width, height = self.__extent_size()
+        if width != self.canvas_width or height != self.canvas_height:
+            self.set_canvas_size(width, height)
+
+    # auto_extent时内容对应的画布大小
+    def __extent_size(self) -> tuple[int, int]:
+        state, extent = self._state, self.__extent
+        width = max(math.ceil(extent.right * state.scale), extent.min_size[0], state.width)
+        height = max(math.ceil(extent.bottom * state.scale), extent.min_size[1], state.height)
+        return width, height
+
+    # 修改实际画布大小
+    def set_canvas_size(self, width: int | float = None, height: int | float = None):
+        """
+        修改实际画布的大小，可移动距离、比值与绑定的IkScrollBar滑块随之更新
+        :param width: 实际画布的宽度，None则不变
+        :param height: 实际画布的高度，None则不变
+        """
+        if width is not None: self.canvas_width = width
+        if height is not None: self.canvas_height = height
+        if self.scroll_mode == "view":
+            self.config(scrollregion=(0, 0, self.canvas_width, self.canvas_height))
+        state = self._state
+        state.right = max(self.canvas_width - state.width, 0)
+        state.down = max(self.canvas_height - state.height, 0)
+        if state.x + state.right < 0:  # 右部超出范围
+            self.move(-(state.x + state.right), 0)
+        if state.y + state.down < 0:  # 底部超出范围
+            self.move(0, -(state.y + state.down))
+        self.__calc()
+        for scrollbar in (self.x_scroll, self.y_scroll):
+            if scrollbar is not None and scrollbar.canvas is self:
+                scrollbar.update_slider()
+        if self.__master_size is not None:  # 扩展的宽高之前可能被实际画布大小限制，按新的大小重新布局
+            self._master_layout(*self.__master_size)
+        self.__update_viewport()
+
+    # 缩放
+    def zoom(self, factor: float, x: int | float = None, y: int | float = None):
+        """
+        在当前缩放比例的基础上缩放
+        :param factor: 缩放倍数，大于1放大，小于1缩小
+        :param x: 缩放中心的窗口x坐标（如event.x），None则为视口中心
+        :param y: 缩放中心的窗口y坐标，None则为视口中心
+        """
+        if factor <= 0:
+            raise ValueError("factor must be greater than 0")
+        self.set_zoom(self._state.scale * factor, x, y)
+
+    # 设置缩放比例
+    def set_zoom(self, scale: float, x: int | float = None, y: int | float = None):
+        """
+        设置缩放比例，缩放中心在窗口上的位置保持不变，比例限制在zoom_min到zoom_max之间；
+        元素坐标由Tk在一次scale调用内统一缩放，虚拟元素与静态缓存按新比例重新生成，线宽、字体大小不随缩放改变；
+        实际画布大小随比例缩放，get_ratio、get_count与滑块保持正确
+        :param scale: 缩放比例，1为原始大小
+        :param x: 缩放中心的窗口x坐标，None则为视口中心
+        :param y: 缩放中心的窗口y坐标，None则为视口中心
+        """
+        state = self._state
+        scale = min(max(scale, self.zoom_min), self.zoom_max)
+        old = state.scale
+        if scale == old: return
+        self.stop_scroll()
+        if x is None: x = state.width / 2
+        if y is None: y = state.height / 2
+        # 缩放中心对应的逻辑坐标
+        logical_x, logical_y = (x - state.x) / old, (y - state.y) / old
+        ratio = scale / old
+        off_x, off_y = self._canvas_offset()
+        tk.Canvas.scale(self, "all", off_x, off_y, ratio, ratio)  # 以逻辑原点为中心缩放，_locate不受影响
+        state.scale = scale
+        # 虚拟元素与静态分块按新比例重新生成
+        virtual = self.__virtual
+        if virtual is not None:
+            for vid in virtual.shown:
+                self.__hide_virtual(virtual.items[vid])
+            virtual.shown = set()
+        if self.__static is not None:
+            self.__static.clear()
+        if self.auto_extent:
+            self.set_canvas_size(*self.__extent_size())
+        else:
+            self.set_canvas_size(self.canvas_width * ratio, self.canvas_height * ratio)
+        self.scroll_to(logical_x * scale - x, logical_y * scale - y, duration=0)
+        self.__update_viewport()
+        self.__apply_lod()
+
+    # 添加细节层次
+    def add_lod(self, threshold: float, detail=None, proxy=None, callback=None):
+        """
+        缩放比例低于阈值时隐藏细节元素、显示代理元素，高于阈值时相反，只在跨过阈值时切换，缩小后的画面保持流畅
+        :param threshold: 缩放比例阈值
+        :param detail: 细节元素的标签，低于阈值时隐藏
+        :param proxy: 代理元素（简化图形）的标签，低于阈值时显示
+        :param callback: 跨过阈值时的回调函数，参数为(画布, 是否低于阈值)
+        """
+        if threshold <= 0:
+            raise ValueError("threshold must be greater than 0")
+        lod = [threshold, detail, proxy, callback, None]
+        self.__lods += (lod,)
+        self.__apply_lod()
+
+    # 移除细节层次
+    def remove_lod(self, threshold: float) -> bool:
+        """
+        移除该阈值的细节层次，元素保持当前的显示状态
+        :return: 存在并移除返回True，否则返回False
+        """
+        count = len(self.__lods)
+        self.__lods = tuple(lod for lod in self.__lods if lod[0] != threshold)
+        return len(self.__lods) != count
+
+    # 按当前缩放比例切换细节层次
+    def __apply_lod(self):
+        scale = self._state.scale
+        for lod in self.__lods:
+            threshold, detail, proxy, callback, below = lod
+            if below is (scale < threshold): continue  # 未跨过阈值
+            lod[4] = below = scale < threshold
+            if detail is not None: self.itemconfig(detail, state="hidden" if below else "normal")
+            if proxy is not None: self.itemconfig(proxy, state="normal" if below else "hidden")
+            if callback is not None: callback(self, below)
+
+    # 点命中检测
+    def items_at(self, x, y, window: bool = False) -> tuple[int, ...]:
+        """
+        获取包围盒包含该点的元素，不经过Tk，需开启spatial_index
+        :param x: x坐标
+        :param y: y坐标
+        :param window: 为True时x、y为窗口坐标（如event.x、event.y），否则为逻辑坐标（未滚动、未缩放时的画布坐标）
+        :return: 元素id，按id从小到大排列
+        """
+        if self._item_index is None:
+            raise ValueError("spatial_index未开启")
+        if window:
+            x, y = (x - self._state.x) / self._state.scale, (y - self._state.y) / self._state.scale
+        return tuple(sorted(self._item_index.query_point(x, y)))
+
+    # 区域查询
+    def items_in(self, rect: tuple, window: bool = False) -> tuple[int, ...]:
+        """
+        获取包围盒与矩形相交的元素，不经过Tk，需开启spatial_index
+        :param rect: 矩形(x0, y0, x1, y1)
+        :param window: 为True时rect为窗口坐标，否则为逻辑坐标（未滚动、未缩放时的画布坐标）
+        :return: 元素id，按id从小到大排列
+        """
+        if self._item_index is None:
+            raise ValueError("spatial_index未开启")
+        x0, y0, x1, y1 = rect
+        if window:
+            state = self._state
+            x0, y0 = (x0 - state.x) / state.scale, (y0 - state.y) / state.scale
+            x1, y1 = (x1 - state.x) / state.scale, (y1 - state.y) / state.scale
+        return tuple(sorted(self._item_index.query(x0, y0, x1, y1)))
+
+    # 平滑滚动到指定位置
+    def scroll_to(self, x=None, y=None, duration: float = 0.25, easing="ease_out"):
+        """
+        滚动到指定的已移动距离，按帧分步移动，新的滚动会打断正在进行的滚动；
+        每帧的移动距离会根据frame_budget自动调整，单帧耗时超出预算时减小步长，滚动时间随之延长
+        :param x: 目标x移动距离，None则不变
+        :param y: 目标y移动距离，None则不变
+        :param duration: 持续时间（秒），小于等于0时立即移动
+        :param easing: 缓动函数，可选linear、ease_in、ease_out、ease_in_out，也可传入输入输出均为0~1的函数
+        """
+        self.stop_scroll()
+        self.__apply_pending()
+        state = self._state
+        start_x, start_y = -state.x, -state.y
+        target_x = start_x if x is None else min(max(x, 0), state.right)
+        target_y = start_y if y is None else min(max(y, 0), state.down)
+        if duration <= 0:
+            if target_x != start_x: self.move(start_x - target_x, 0)
+            if target_y != start_y: self.move(0, start_y - target_y)
+            return
+        if not callable(easing):
+            if easing not in _EASINGS:
+                raise ValueError("easing must be 'linear', 'ease_in', 'ease_out', 'ease_in_out' or a function")
+            easing = _EASINGS[easing]
+        begin = time.perf_counter()
+
+        def position(now):
+            progress = min((now - begin) / duration, 1.0)
+            ratio = easing(progress)
+            return start_x + (target_x - start_x) * ratio, start_y + (target_y - start_y) * ratio, progress >= 1
+        self.__animate(position)
+
+    # 惯性滚动
+    def fling(self, vx: int | float, vy: int | float, decay: float = 0.35):
+        """
+        以指定速度开始惯性滚动，速度按指数衰减，会打断正在进行的滚动
+        :param vx: x方向速度（像素/秒），正数表示移动距离增加，即向右滚动
+        :param vy: y方向速度（像素/秒），正数表示向下滚动
+        :param decay: 衰减的时间常数（秒），越大滑得越远，总距离为速度 * decay
+        """
+        self.stop_scroll()
+        if decay <= 0:
+            raise ValueError("decay must be greater than 0")
+        self.__apply_pending()
+        state = self._state
+        start_x, start_y = -state.x, -state.y
+        begin = time.perf_counter()
+
+        def position(now):
+            elapsed = now - begin
+            distance = decay * (1 - math.exp(-elapsed / decay))
+            want_x = min(max(start_x + vx * distance, 0), state.right)
+            want_y = min(max(start_y + vy * distance, 0), state.down)
+            # 速度低于10像素/秒，或运动的方向都已到达边界时停止
+            speed = max(abs(vx), abs(vy)) * math.exp(-elapsed / decay)
+            stuck_x = vx == 0 or want_x in (0, state.right)
+            stuck_y = vy == 0 or want_y in (0, state.down)
+            return want_x, want_y, speed < 10 or (stuck_x and stuck_y)
+        self.__animate(position)
+
+    # 停止平滑滚动或惯性滚动
+    def stop_scroll(self):
+        """
+        停止正在进行的平滑滚动或惯性滚动，画布停在当前位置
+        """
+        state = self._state
+        if state.anim_id is not None:
+            self.after_cancel(state.anim_id)
+            state.anim_id = None
+        state.anim = None
+
+    # 开始动画
+    def __animate(self, position):
+        self._state.anim = position
+        self.__animate_step()
+
+    # 动画的一帧
+    def __animate_step(self):
+        state = self._state
+        state.anim_id = None
+        if state.anim is None: return
+        begin = time.perf_counter()
+        want_x, want_y, finished = state.anim(begin)
+        # 与当前已移动距离的差值
+        dx = min(max(want_x, 0), state.right) + state.x
+        dy = min(max(want_y, 0), state.down) + state.y
+        limit = state.anim_limit
+        capped = abs(dx) > limit or abs(dy) > limit  # 本帧未能到达目标
+        dx, dy = min(max(dx, -limit), limit), min(max(dy, -limit), limit)
+        if dx: self.move(-dx, 0)
+        if dy: self.move(0, -dy)
+        # 根据本帧耗时调整步长
+        cost = time.perf_counter() - begin
+        if cost > self.frame_budget:
+            state.anim_limit = max(limit / 2, 1.0)
+        elif cost < self.frame_budget / 2 and capped:
+            state.anim_limit = limit * 1.5
+        if finished and not capped:
+            state.anim = None
+            return
+        state.anim_id = self.after(max(int(1000 / self.max_fps), 1), self.__animate_step)
+
     # 移动到指定位置
-    def move_to(self, direction: str):
+    def move_to(self, direction: str, duration: float = 0, easing="ease_out"):
         """
         移动到指定方向
         :param direction: 方向，up, down, left, right
+        :param duration: 平滑滚动的持续时间（秒），为0时立即移动
+        :param easing: 平滑滚动的缓动函数，见scroll_to
         """
-        locate = self.coords(self._locate)
+        state = self._state
         if direction == "up":
-            self.move(0, -locate[1])
+            self.scroll_to(y=0, duration=duration, easing=easing)
         elif direction == "down":
-            self.move(0, -locate[1] + self.__down)
+            self.scroll_to(y=state.down, duration=duration, easing=easing)
         elif direction == "left":
-            self.move(-locate[0], 0)
+            self.scroll_to(x=0, duration=duration, easing=easing)
         elif direction == "right":
-            self.move(-locate[0] + self.__right, 0)
+            self.scroll_to(x=state.right, duration=duration, easing=easing)
         else:
             raise ValueError("direction must be 'up', 'down', 'left', 'right'")
         self.__calc()
@@ -242,6 +1821,9 @@ class IkCanvas(tk.Canvas):
 
 # 自定义滚动条
 class IkScrollBar(tk.Canvas):
+    # 默认配色，未指定style且使用默认颜色的滚动条共用，修改颜色时先复制
+    _default_colors = {"normal": "#CDCDCD", "focus": "#A6A6A6", "press": "#606060"}
+
     def __init__(
             self,
             master: tk.Tk | tk.Canvas | tk.Frame,
@@ -257,7 +1839,10 @@ class IkScrollBar(tk.Canvas):
             slider_min: int = 50,
             slider_side: str = "center",
             slider_bg: str = "#CDCDCD", focus_color: str = "#A6A6A6", press_color: str = "#606060",
-            commands: dict[str, callable] = {"enter": None, "press": None, "release": None}
+            commands: dict[str, callable] = {"enter": None, "press": None, "release": None},
+            kinetic: bool = False,
+            style: "IkStyle" = None,
+            lazy: bool = False
     ):
         """
         IkCanvas无需config(scrollregion=...)，就可直接使用IkScrollBar；
@@ -281,8 +1866,13 @@ class IkScrollBar(tk.Canvas):
         :param focus_color:  鼠标悬停在滑块上时的颜色
         :param press_color:  鼠标按下滑块时的颜色
         :param commands: 滑块回调函数，键("enter", "press", "release")分别表示鼠标进入滚动条，鼠标按下，释放滑块，值为对应键的回调函数
+        :param kinetic: 是否开启惯性滚动，快速拖动滑块后松开，画布会按拖动速度继续滚动并逐渐停下
+        :param style: 共用的样式IkStyle，指定后滑块颜色取自样式，样式的scroll_bg不为None时代替scroll_bg，切换主题时统一更新
+        :param lazy: 延迟初始化，创建时不强制刷新父容器的布局，滑块在第一次<Configure>时计算，不再等待20ms；
+            在IkLayoutBatch中创建时自动开启
         """
         super().__init__(master)
+        IkProfiler._register(self)
         # 参数检测
         if canvas is master:  # 父容器不能与画布相同
             raise ValueError("master cannot be the same as canvas")
@@ -319,7 +1909,8 @@ class IkScrollBar(tk.Canvas):
                 raise TypeError("canvas must be an instance of IkCanvas")
             self.bind_canvas(canvas)  # 绑定画布
         # 滚动条参数
-        master.update_idletasks()  # 刷新父容器尺寸
+        lazy = lazy or IkLayoutBatch._depth > 0
+        if not lazy: master.update_idletasks()  # 刷新父容器尺寸
         if self.orient == "v":
             if expand:
                 scroll_height = master.winfo_reqheight()  # 滚动条高度为父容器高度
@@ -335,12 +1926,21 @@ class IkScrollBar(tk.Canvas):
                     raise ValueError("scroll_width must > slider_min")
                 scroll_width = scroll_width  # 指定宽度
         self.scroll_size = [scroll_width, scroll_height]
-        # canvas参数
-        if scroll_bg is None:
-            self["bg"] = master["bg"]  # 跟随父窗口背景色
+        # 样式，滑块各状态的颜色
+        self.style = style
+        if style is not None:
+            style._register(self)
+            self._colors = style.slider_colors  # 与样式共用，切换主题后自动生效
+            if style.options["scroll_bg"] is not None: scroll_bg = style.options["scroll_bg"]
         else:
-            self["bg"] = scroll_bg  # 自定义背景色
-        self.config(width=self.scroll_size[0], height=self.scroll_size[1], highlightthickness=0)
+            self._colors = {"normal": slider_bg, "focus": focus_color, "press": press_color}
+            if self._colors == IkScrollBar._default_colors:  # 默认配色共用同一个字典
+                self._colors = IkScrollBar._default_colors
+        # canvas参数，scroll_bg为None时跟随父窗口背景色
+        self.config(
+            bg=master["bg"] if scroll_bg is None else scroll_bg,
+            width=self.scroll_size[0], height=self.scroll_size[1], highlightthickness=0
+        )
         # 滑块参数
         self.slider_init_pos: int = ...  # 滑块初始位置
         if self.orient == "v":  # 垂直滚动条
@@ -376,9 +1976,7 @@ class IkScrollBar(tk.Canvas):
         self.step = step  # 变化的步长
         self.wheel_step = wheel_step
         self.slider_min = slider_min
-        self.slider_bg = slider_bg
-        self.focus_color = focus_color
-        self.press_color = press_color
+        self.kinetic = kinetic
         # 回调函数
         self._command_enter = commands.get("enter", None)
         self._command_press = commands.get("press", None)
@@ -391,32 +1989,21 @@ class IkScrollBar(tk.Canvas):
             fill=scroll_bg, width=0, tags="scrollbar",
         )
         # 绘制滑块
+        # 滑块的几何与颜色状态缓存在Python侧，只在变化时发送Tk命令
+        slider = self._slider = _SliderState()
         if self.orient == "v":
-            self.Slider = self.create_rectangle(
-                self.slider_init_pos, 0, self.slider_width + self.slider_init_pos, self.slider_height,
-                fill=self.slider_bg, width=0, tags="slider",
-            )
+            slider.x0, slider.y0 = self.slider_init_pos, 0
+            slider.x1, slider.y1 = self.slider_width + self.slider_init_pos, self.slider_height
         else:  # 水平滚动条
-            self.Slider = self.create_rectangle(
-                0, self.slider_init_pos, self.slider_width, self.slider_height + self.slider_init_pos,
-                fill=self.slider_bg, width=0, tags="slider",
-            )
-        # 变量
-        self.__in_sider = False  # 鼠标是否在滑块中
-        self.__press_pos: list[int, int] = [0, 0]  # 鼠标点击位置
-        self.__press = False  # 鼠标是否按下
-        # 绑定
-        self.bind("<Enter>", self.__enter)  # 鼠标进入
-        self.bind("<Motion>", self.__motion)  # 鼠标移动
-        self.bind("<Leave>", self.__leave)  # 鼠标离开
-        self.bind("<Button-1>", self.__click)  # 鼠标左键按下
-        self.bind("<ButtonRelease-1>", self.__release)  # 鼠标左键释放
-        self.bind("<Configure>", self.__on_resize)  # 画布大小改变
-        if self.expand:  # add=True表示不覆盖上一个绑定
-            self.__master_bind_configure_id = self.master.bind("<Configure>", self.__on_master_resize, add=True)
-        self.bind("<MouseWheel>", self.__on_wheel)  # 滚轮滚动
-        self.bind("<Destroy>", self.__on_destroy)
-        self.after(20, self.__calc)  # 延迟20ms后计算，等待画布初始化
+            slider.x0, slider.y0 = 0, self.slider_init_pos
+            slider.x1, slider.y1 = self.slider_width, self.slider_height + self.slider_init_pos
+        slider.drawn = (round(slider.x0), round(slider.y0), round(slider.x1), round(slider.y1))
+        self.Slider = self.create_rectangle(*slider.drawn, fill=self.slider_bg, width=0, tags="slider")
+        # 绑定，鼠标、大小改变、滚轮、销毁事件由所有滚动条共用的类绑定分发
+        _bind_shared(self, "IkScrollBar", IkScrollBar, IkScrollBar._HANDLERS)
+        if self.expand:  # 跟随父容器大小改变
+            _ResizeScheduler.attach(self, layout=lazy)
+        if not lazy: self.after(20, self.__calc)  # 延迟20ms后计算，等待画布初始化，lazy时由<Configure>计算
 
     # 绑定画布
     def bind_canvas(self, canvas: "IkCanvas") -> bool:
@@ -436,16 +2023,15 @@ class IkScrollBar(tk.Canvas):
     def __on_resize(self, event):
         self.__calc()
 
-    # 父容器大小改变
-    def __on_master_resize(self, event):
+    # 父容器大小改变后的布局，由_ResizeScheduler在空闲时统一调用
+    def _master_layout(self, width, height):
         direction = self.scroll_shorten[0]
         distance = self.scroll_shorten[1]
-        width = self.master.winfo_width()
-        height = self.master.winfo_height()
         if self.orient == "v":   # 垂直滚动条才处理高度
             height -= distance
         else:   # 水平滚动条才处理宽度
             width -= distance
+        if self.scroll_size == [width, height]: return  # 尺寸未变
         self.scroll_size = [width, height]
         if self.orient == "v":
             self.config(height=height)
@@ -476,7 +2062,7 @@ class IkScrollBar(tk.Canvas):
                 self.step = self.canvas.get_count[1] / (self.scroll_size[1] - self.slider_min)
                 pos_y = self.canvas.get_moved_count[1] / self.step
             else:  # 正常高度
-                pos_y = self.coords("slider")[1]
+                pos_y = self._slider.y0
                 self.step = self.init_step  # 步长恢复初始值
         else:  # 水平滚动条
             if self.canvas.x_scroll is not self:
@@ -489,7 +2075,7 @@ class IkScrollBar(tk.Canvas):
                 self.step = self.canvas.get_count[0] / (self.scroll_size[0] - self.slider_min)
                 pos_x = self.canvas.get_moved_count[0] / self.step
             else:  # 正常宽度
-                pos_x = self.coords("slider")[0]
+                pos_x = self._slider.x0
                 self.step = self.init_step
         self._draw_slider(pos_x, pos_y)
 
@@ -500,76 +2086,155 @@ class IkScrollBar(tk.Canvas):
         :param x: 水平滚动条时有效
         :param y: 垂直滚动条时有效
         """
+        slider = self._slider
         if self.orient == "v":
-            self.coords(
-                "slider",
-                self.slider_init_pos, y,
-                self.slider_init_pos + self.slider_width, self.slider_height + y
-            )
+            slider.x0, slider.y0 = self.slider_init_pos, y
+            slider.x1, slider.y1 = self.slider_init_pos + self.slider_width, self.slider_height + y
         else:
-            self.coords(
-                "slider",
-                x, self.slider_init_pos,
-                x + self.slider_width, self.slider_height + self.slider_init_pos
-            )
+            slider.x0, slider.y0 = x, self.slider_init_pos
+            slider.x1, slider.y1 = x + self.slider_width, self.slider_height + self.slider_init_pos
+        drawn = (round(slider.x0), round(slider.y0), round(slider.x1), round(slider.y1))
+        if drawn == slider.drawn:  # 取整后的像素位置未变
+            slider.saved_calls += 1
+            return
+        slider.drawn = drawn
+        self.coords("slider", *drawn)
+
+    # 设置滑块颜色状态，未改变时不发送itemconfig
+    def __set_color(self, state: str):
+        slider = self._slider
+        if state == slider.color:
+            slider.saved_calls += 1
+            return
+        slider.color = state
+        self.itemconfig("slider", fill=self._colors[state])
+
+    # 修改某个状态的颜色，颜色字典可能与样式或其他滚动条共用，复制后再修改
+    def __set_state_color(self, state: str, color: str):
+        self._colors = {**self._colors, state: color}
+        if self._slider.color == state:  # 正在显示该状态，立即生效
+            self.itemconfig("slider", fill=color)
+
+    @property
+    def slider_bg(self) -> str:
+        """
+        滑块无事件时的背景色，修改后立即生效；指定了style时，修改后不再跟随样式的滑块颜色
+        """
+        return self._colors["normal"]
+
+    @slider_bg.setter
+    def slider_bg(self, color: str):
+        self.__set_state_color("normal", color)
+
+    @property
+    def focus_color(self) -> str:
+        """
+        鼠标悬停在滑块上时的颜色，修改同slider_bg
+        """
+        return self._colors["focus"]
+
+    @focus_color.setter
+    def focus_color(self, color: str):
+        self.__set_state_color("focus", color)
+
+    @property
+    def press_color(self) -> str:
+        """
+        鼠标按下滑块时的颜色，修改同slider_bg
+        """
+        return self._colors["press"]
+
+    @press_color.setter
+    def press_color(self, color: str):
+        self.__set_state_color("press", color)
+
+    # 样式改变后要执行的Tcl命令，由IkStyle在空闲时合并执行
+    def _style_script(self, style: "IkStyle") -> list[str]:
+        script = [f"{self._w} itemconfigure slider -fill {tk._stringify(self._colors[self._slider.color])}"]
+        bg = style.options["scroll_bg"]
+        if bg is not None:
+            bg = tk._stringify(bg)
+            script += [f"{self._w} configure -background {bg}", f"{self._w} itemconfigure scrollbar -fill {bg}"]
+        return script
+
+    @property
+    def get_saved_calls(self) -> int:
+        """
+        获取因滑块位置、颜色未变而省去的Tcl调用次数，用于性能测试
+        """
+        return self._slider.saved_calls
 
     def __enter(self, event):
-        if self._command_enter is not None:  # 进入的回调函数
-            self._command_enter()
+        self._run_command(self._command_enter)  # 进入的回调函数
 
     def __motion(self, event):
         if self.canvas is None: return  # 未绑定画布
-        if self.__press:  # 鼠标按下，移动滑块
+        slider = self._slider
+        if slider.press:  # 鼠标按下，移动滑块
             if self.orient == "v":
                 if self.canvas.y_scroll is not self: return  # 画布未绑定本滚动条
-                move_y = event.y - self.__press_pos[1]
-                self.canvas.move(0, -move_y * self.step)  # 移动画布，且会自动移动滑块
+                distance = (event.y - slider.press_y) * self.step
+                self.canvas.post_move(0, -distance)  # 移动画布，且会自动移动滑块
             else:
                 if self.canvas.x_scroll is not self: return  # 画布未绑定本滚动条
-                move_x = event.x - self.__press_pos[0]
-                self.canvas.move(-move_x * self.step, 0)
-            self.__press_pos = [event.x, event.y]
+                distance = (event.x - slider.press_x) * self.step
+                self.canvas.post_move(-distance, 0)
+            slider.press_x, slider.press_y = event.x, event.y
+            if self.kinetic:  # 平滑估计拖动速度
+                now = time.perf_counter()
+                interval = now - slider.drag_time
+                if interval > 0:
+                    slider.drag_velocity = 0.8 * distance / interval + 0.2 * slider.drag_velocity
+                slider.drag_time = now
         else:
-            slider_info = self.coords("slider")
+            x0, y0, x1, y1 = slider.drawn  # 与Tk中的滑块一致，无需查询coords
+            slider.saved_calls += 1
             # 鼠标在滑块中
-            if slider_info[0] <= event.x <= slider_info[2] and slider_info[1] <= event.y <= slider_info[3]:
-                self.itemconfig("slider", fill=self.focus_color)
-                self.__in_sider = True
-            else:  # 恢复默认颜色
-                self.itemconfig("slider", fill=self.slider_bg)
-                self.__in_sider = False
+            slider.in_slider = x0 <= event.x <= x1 and y0 <= event.y <= y1
+            self.__set_color("focus" if slider.in_slider else "normal")
 
     def __leave(self, event):
-        if not self.__press:
-            self.itemconfig("slider", fill=self.slider_bg)
-            self.__in_sider = False
+        if not self._slider.press:
+            self.__set_color("normal")
+            self._slider.in_slider = False
 
     def __click(self, event):
-        if self.__in_sider:
-            self.__press = True
-            self.__press_pos = [event.x, event.y]
-            self.itemconfig("slider", fill=self.press_color)
-            if self._command_press is not None:  # 按下的回调函数
-                self._command_press()
+        slider = self._slider
+        if slider.in_slider:
+            slider.press = True
+            slider.press_x, slider.press_y = event.x, event.y
+            slider.drag_time, slider.drag_velocity = time.perf_counter(), 0.0
+            if self.canvas is not None:  # 按下滑块时停止画布的平滑滚动
+                self.canvas.stop_scroll()
+            self.__set_color("press")
+            self._run_command(self._command_press)  # 按下的回调函数
 
     def __release(self, event):
-        if self.__press:
-            self.__press = False
-            self.itemconfig("slider", fill=self.focus_color)
-            if self._command_release is not None:  # 释放的回调函数
-                self._command_release()
+        slider = self._slider
+        if slider.press:
+            slider.press = False
+            self.__set_color("focus")
+            # 松开前仍在拖动且速度足够时惯性滚动
+            if self.kinetic and self.canvas is not None and time.perf_counter() - slider.drag_time < 0.1 \
+                    and abs(slider.drag_velocity) > 50:
+                if self.orient == "v":
+                    self.canvas.fling(0, slider.drag_velocity)
+                else:
+                    self.canvas.fling(slider.drag_velocity, 0)
+            self._run_command(self._command_release)  # 释放的回调函数
 
     def __on_wheel(self, event):
         if self.canvas is None: return
+        self.canvas.stop_scroll()
         wheel = self.wheel_step * -event.delta / 120
         if self.orient == "v":  # 垂直滚动条
             if self.canvas.y_scroll is not self:  # 未绑定本滚动条
                 return
-            self.canvas.move(0, -wheel)
+            self.canvas.post_move(0, -wheel)
         else:  # 水平滚动条
             if self.canvas.x_scroll is not self:  # 未绑定本滚动条
                 return
-            self.canvas.move(-wheel, 0)
+            self.canvas.post_move(-wheel, 0)
 
     def __on_destroy(self, event):
         if self.canvas is not None:
@@ -577,17 +2242,1070 @@ class IkScrollBar(tk.Canvas):
                 self.canvas.y_scroll = None  # 解绑绑定
             else:  # 水平滚动条
                 self.canvas.x_scroll = None  # 解绑绑定
-        self.unbind("<Enter>")
-        self.unbind("<Motion>")
-        self.unbind("<Leave>")
-        self.unbind("<Button-1>")
-        self.unbind("<ButtonRelease-1>")
-        self.unbind("<Configure>")
         if self.expand:
-            self.master.unbind("<Configure>", self.__master_bind_configure_id)
-        self.unbind("<MouseWheel>")
-        self.unbind("<Destroy>")
+            _ResizeScheduler.detach(self)
+
+    # 所有滚动条共用的事件处理，由_bind_shared按类绑定
+    _HANDLERS = {
+        "<Enter>": lambda widget, event: widget.__enter(event),  # 鼠标进入
+        "<Motion>": lambda widget, event: widget.__motion(event),  # 鼠标移动
+        "<Leave>": lambda widget, event: widget.__leave(event),  # 鼠标离开
+        "<Button-1>": lambda widget, event: widget.__click(event),  # 鼠标左键按下
+        "<ButtonRelease-1>": lambda widget, event: widget.__release(event),  # 鼠标左键释放
+        "<Configure>": lambda widget, event: widget.__on_resize(event),  # 画布大小改变
+        "<MouseWheel>": lambda widget, event: widget.__on_wheel(event),  # 滚轮滚动
+        "<Destroy>": lambda widget, event: widget.__on_destroy(event),
+    }
+
+    # 执行回调函数
+    def _run_command(self, command):
+        if command is not None:
+            command()
+
+    # 重新计算滑块
+    def update_slider(self):
+        """
+        绑定画布的大小改变后，重新计算滑块的大小与位置
+        """
+        self.__calc()
+        if self.canvas is not None:
+            moved_x, moved_y = self.canvas.get_moved_count
+            if self.orient == "v": self.move_slider(0, moved_y)
+            else: self.move_slider(moved_x, 0)
 
     # 外部调用，移动滑块
     def move_slider(self, x, y):
         self._draw_slider(x / self.step, y / self.step)
+
+
+# 虚拟列表，只绘制可见的行
+class IkVirtualList(IkCanvas):
+    def __init__(
+            self, master,
+            source=None,
+            row_count: int = 0,
+            fetch=None,
+            row_height: int | float = 24,
+            fixed_height: bool = True,
+            padding: int | float = 6,
+            font=None,
+            fg: str = "#000000",
+            stripe: str = None,
+            **kwargs
+    ):
+        """
+        长列表控件，只为可见的行创建文本元素，滚出视口的行元素回收给新露出的行，滚动开销与行数无关；
+        实际画布高度为所有行的总高度，绑定的IkScrollBar滑块随行数变化；
+        数据改变后调用refresh，行号可用row_at由事件坐标获取。
+        :param master: 父容器
+        :param source: 数据源，支持len()和下标访问的对象（如list），每行显示str(source[行号])
+        :param row_count: 行数，source为None时有效
+        :param fetch: 获取行文本的函数，参数为行号，source为None时有效
+        :param row_height: 行高，fixed_height为False时为未显示过的行的估计行高
+        :param fixed_height: 是否固定行高，为False时按文本实际高度测量显示过的行，画布高度随之修正
+        :param padding: 文本到左边的距离，测量行高时也作为上下的间距
+        :param font: 字体
+        :param fg: 文本颜色
+        :param stripe: 偶数行的背景色，None则不绘制背景
+        :param kwargs: IkCanvas的参数，canvas_height由行高决定，无需指定
+        """
+        if row_height <= 0:
+            raise ValueError("row_height must be greater than 0")
+        kwargs.pop("canvas_height", None)
+        self.row_height = row_height
+        self.fixed_height = fixed_height
+        self.padding = padding
+        self.font, self.fg, self.stripe = font, fg, stripe
+        # 数据源
+        self.__source, self.__fetch, self.__count = None, None, 0
+        self.__set_source(source, row_count, fetch)
+        # 已测量的行高：行号按顺序排列，前缀和为与估计行高的累计差值
+        self.__measured: dict[int, float] = {}
+        self.__measured_rows: list[int] = []
+        self.__measured_sum: list[float] = []
+        # 行元素池，每个行元素为[文本元素, 背景元素, 是否显示]
+        self.__bound: dict[int, list] = {}  # 行号 -> 行元素
+        self.__free: list[list] = []  # 空闲的行元素
+        # 画布高度至少为展示的高度，行数较少时也能正常布局
+        if not kwargs.get("expand_height", True): visible = kwargs.get("show_height", ...)
+        elif kwargs.get("lazy", False) or IkLayoutBatch._depth > 0: visible = 0  # 由父容器第一次布局决定
+        else:
+            master.update_idletasks()
+            visible = master.winfo_height()
+        if visible is ...: visible = 0  # 未指定时交给IkCanvas报错
+        super().__init__(master, canvas_height=max(self.__total_height(), visible, 1), **kwargs)
+
+    # 设置数据源
+    def __set_source(self, source, row_count, fetch):
+        if source is not None:
+            if not hasattr(source, "__len__") or not hasattr(source, "__getitem__"):
+                raise TypeError("source must support len() and indexing")
+            self.__source, self.__fetch, self.__count = source, None, len(source)
+        else:
+            if row_count < 0:
+                raise ValueError("row_count must be greater than or equal to 0")
+            if row_count and not callable(fetch):
+                raise TypeError("fetch must be callable")
+            self.__source, self.__fetch, self.__count = None, fetch, row_count
+
+    # 更换数据源
+    def set_source(self, source=None, row_count: int = 0, fetch=None):
+        """
+        更换数据源，参数同初始化，已测量的行高会被清空，滚动位置超出新的范围时复位
+        """
+        self.__set_source(source, row_count, fetch)
+        self.__measured, self.__measured_rows, self.__measured_sum = {}, [], []
+        self.refresh()
+
+    # 刷新
+    def refresh(self):
+        """
+        数据改变后刷新，重新读取行数并重新获取可见行的文本
+        """
+        if self.__source is not None: self.__count = len(self.__source)
+        for slot in self.__bound.values():  # 可见行全部重新绑定
+            self.__free.append(slot)
+        self.__bound.clear()
+        state = self._state
+        self.set_canvas_size(height=max(self.__total_height() * state.scale, state.height, 1))  # 会触发_on_viewport
+
+    @property
+    def get_row_count(self) -> int:
+        """
+        获取行数
+        """
+        return self.__count
+
+    # 行的文本
+    def row_text(self, row: int) -> str:
+        """
+        获取该行显示的文本，子类可重写以自定义格式
+        """
+        if self.__source is not None: return str(self.__source[row])
+        return str(self.__fetch(row))
+
+    # 行高
+    def __row_size(self, row: int) -> float:
+        return self.__measured.get(row, self.row_height)
+
+    # 行顶部的逻辑坐标
+    def row_top(self, row: int) -> float:
+        """
+        获取行顶部的逻辑坐标（未滚动、未缩放时的画布坐标）
+        """
+        top = row * self.row_height
+        if self.__measured_rows:
+            i = bisect.bisect_left(self.__measured_rows, row)
+            if i: top += self.__measured_sum[i - 1]
+        return top
+
+    # 所有行的总高度
+    def __total_height(self) -> float:
+        total = self.__count * self.row_height
+        if self.__measured_sum: total += self.__measured_sum[-1]
+        return total
+
+    # 逻辑坐标所在的行，超出范围时取最近的行
+    def __row_at(self, y: float) -> int:
+        last = self.__count - 1
+        if not self.__measured_rows:
+            return min(max(int(y // self.row_height), 0), last)
+        low, high = 0, last  # 二分查找顶部不超过y的最后一行
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.row_top(mid) <= y: low = mid
+            else: high = mid - 1
+        return low
+
+    # 坐标所在的行
+    def row_at(self, y: int | float, window: bool = True) -> int:
+        """
+        获取坐标所在的行号
+        :param y: y坐标
+        :param window: 为True时y为窗口坐标（如event.y），否则为逻辑坐标
+        :return: 行号，不在任何行上时返回-1
+        """
+        state = self._state
+        if window: y = (y - state.y) / state.scale
+        if not self.__count or y < 0 or y >= self.__total_height(): return -1
+        return self.__row_at(y)
+
+    # 滚动到行可见
+    def see(self, row: int, duration: float = 0, easing="ease_out"):
+        """
+        滚动使该行完整可见，已可见时不滚动
+        :param row: 行号
+        :param duration: 平滑滚动的持续时间（秒），为0时立即移动
+        :param easing: 平滑滚动的缓动函数，见scroll_to
+        """
+        if not 0 <= row < self.__count:
+            raise IndexError("row out of range")
+        state = self._state
+        top = self.row_top(row) * state.scale
+        bottom = top + self.__row_size(row) * state.scale
+        if top < -state.y:  # 在视口上方
+            self.scroll_to(y=top, duration=duration, easing=easing)
+        elif bottom > -state.y + state.height:  # 在视口下方
+            self.scroll_to(y=bottom - state.height, duration=duration, easing=easing)
+
+    # 行数较少时画布高度跟随父容器
+    def _master_layout(self, width, height):
+        if self.expand_height:
+            want = max(self.__total_height() * self._state.scale, height, 1)
+            if want != self.canvas_height: self.set_canvas_size(height=want)
+        super()._master_layout(width, height)
+
+    # 新建行元素
+    def __new_slot(self) -> list:
+        rect = None
+        if self.stripe is not None:
+            rect = tk.Canvas._create(self, "rectangle", (0, 0, 0, 0), {"width": 0, "state": "hidden", "tags": "ik_row"})
+        text = tk.Canvas._create(
+            self, "text", (0, 0), {"anchor": "w", "fill": self.fg, "font": self.font, "state": "hidden", "tags": "ik_row"}
+        )
+        return [text, rect, False]
+
+    # 移动行元素到行的位置
+    def __place(self, row: int, slot: list):
+        top = self.row_top(row)
+        height = self.__row_size(row)
+        tk.Canvas.coords(self, slot[0], *self._to_canvas((self.padding, top + height / 2)))
+        if slot[1] is not None:
+            tk.Canvas.coords(self, slot[1], *self._to_canvas((0, top, self.canvas_width / self._state.scale, top + height)))
+
+    # 把行元素绑定到行，测量后行高改变时返回True
+    def __bind_row(self, row: int, slot: list) -> bool:
+        text, rect, shown = slot
+        self.__place(row, slot)
+        options = {"text": self.row_text(row)}
+        if not shown: options["state"] = "normal"
+        tk.Canvas.itemconfigure(self, text, **options)
+        if rect is not None:
+            options = {"fill": self.stripe if row % 2 == 0 else ""}
+            if not shown: options["state"] = "normal"
+            tk.Canvas.itemconfigure(self, rect, **options)
+        slot[2] = True
+        if self.fixed_height or row in self.__measured: return False
+        box = tk.Canvas.bbox(self, text)
+        if not box: return False
+        height = (box[3] - box[1]) / self._state.scale + self.padding * 2
+        self.__record_height(row, height)  # 与估计行高相同也记录，避免重复测量
+        return height != self.row_height
+
+    # 记录测量的行高，更新之后的前缀和
+    def __record_height(self, row: int, height: float):
+        rows = self.__measured_rows
+        i = bisect.bisect_left(rows, row)
+        rows.insert(i, row)
+        self.__measured[row] = height
+        total = self.__measured_sum[i - 1] if i else 0.0
+        del self.__measured_sum[i:]
+        for r in rows[i:]:
+            total += self.__measured[r] - self.row_height
+            self.__measured_sum.append(total)
+
+    # 视口改变后绘制新露出的行
+    def _on_viewport(self):
+        state = self._state
+        if not state.height: return  # 尚未布局
+        rows = range(0)
+        if self.__count:
+            top = -state.y / state.scale
+            rows = range(self.__row_at(top), self.__row_at(top + state.height / state.scale) + 1)
+        bound, free = self.__bound, self.__free
+        for row in [row for row in bound if row not in rows]:  # 回收滚出视口的行
+            free.append(bound.pop(row))
+        changed = False
+        for row in rows:
+            if row in bound: continue
+            slot = free.pop() if free else self.__new_slot()
+            bound[row] = slot
+            changed = self.__bind_row(row, slot) or changed
+        for slot in free:  # 未被复用的行元素隐藏
+            if slot[2]:
+                tk.Canvas.itemconfigure(self, slot[0], state="hidden")
+                if slot[1] is not None: tk.Canvas.itemconfigure(self, slot[1], state="hidden")
+                slot[2] = False
+        if changed:  # 行高改变，重新排列可见行并修正画布高度
+            for row, slot in bound.items():
+                self.__place(row, slot)
+            self.set_canvas_size(height=max(self.__total_height() * state.scale, state.height, 1))
+
+
+# 分区异步加载画布内容
+class IkRegionLoader:
+    def __init__(
+            self,
+            canvas: IkCanvas,
+            load,
+            render,
+            region_size: int | float = 512,
+            executor=None,
+            loop=None,
+            max_workers: int = 4,
+            margin: int | float = 0,
+            placeholder: str = "#EEEEEE",
+            batch: int = 32,
+            interval: int = 16,
+            on_error=None,
+    ):
+        """
+        把画布按逻辑坐标划分为正方形分区，视口露出新分区时在后台加载其内容，加载期间显示占位矩形，完成后回到Tk线程绘制；
+        滚出视口且尚未完成的加载会被取消（线程池中已开始执行的无法中断，结果会被丢弃），已绘制的分区保留；
+        后台结果放入线程安全的队列，由Tk线程用after定时分批取出，后台线程不会调用Tk。
+        :param canvas: IkCanvas对象
+        :param load: 加载函数，参数为分区的逻辑坐标范围(x0, y0, x1, y1)，在后台执行；loop不为None时需为协程函数
+        :param render: 绘制函数，在Tk线程执行，参数为(画布, 分区范围, 加载结果)，返回绘制的元素id，reload时删除
+        :param region_size: 分区边长，逻辑坐标
+        :param executor: concurrent.futures的执行器，None且loop为None时自动创建线程池，close时关闭
+        :param loop: 在其他线程运行的asyncio事件循环，指定后用run_coroutine_threadsafe提交load
+        :param max_workers: 自动创建的线程池的线程数
+        :param margin: 预加载边距，视口外该距离内的分区也会加载，滚动方向上按画布估计的速度增加（见IkCanvas.prefetch_time）
+        :param placeholder: 占位矩形的颜色，None则不显示占位
+        :param batch: 每次最多处理的加载结果数
+        :param interval: 取加载结果的间隔（毫秒）
+        :param on_error: 加载失败时的回调函数，参数为(分区范围, 异常)，失败的分区在reload前不再加载
+        """
+        if not isinstance(canvas, IkCanvas):
+            raise TypeError("canvas must be IkCanvas object")
+        if region_size <= 0:
+            raise ValueError("region_size must be greater than 0")
+        if batch <= 0:
+            raise ValueError("batch must be greater than 0")
+        self.canvas = canvas
+        self.load, self.render, self.on_error = load, render, on_error
+        self.region_size = region_size
+        self.margin = margin
+        self.placeholder = placeholder
+        self.batch = batch
+        self.interval = interval
+        self.loop = loop
+        self.__own_executor = executor is None and loop is None  # 自己创建的线程池，close时关闭
+        if self.__own_executor:
+            import concurrent.futures  # 只有IkRegionLoader用到，延迟导入以免拖慢itkinter的导入
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="IkRegionLoader")
+        self.executor = executor
+        # 分区的状态，键为(列, 行)
+        self.__pending: dict[tuple[int, int], "concurrent.futures.Future"] = {}  # 加载中
+        self.__placeholders: dict[tuple[int, int], int] = {}  # 占位矩形
+        self.__loaded: dict[tuple[int, int], list[int]] = {}  # 已绘制的元素
+        self.__failed: set[tuple[int, int]] = set()  # 加载失败
+        self.__results = queue.SimpleQueue()  # 后台完成的(分区, future)
+        self.__poll_id = None  # 取结果的after id
+        self.__closed = False
+        canvas.add_viewport_callback(self.update)
+        canvas.bind("<Destroy>", lambda event: self.close(), add=True)
+        self.update()
+
+    @property
+    def get_pending(self) -> int:
+        """
+        获取加载中的分区数
+        """
+        return len(self.__pending)
+
+    @property
+    def get_loaded(self) -> int:
+        """
+        获取已绘制的分区数
+        """
+        return len(self.__loaded)
+
+    # 分区的逻辑坐标范围
+    def __rect(self, key: tuple[int, int]) -> tuple[float, float, float, float]:
+        size = self.region_size
+        return key[0] * size, key[1] * size, (key[0] + 1) * size, (key[1] + 1) * size
+
+    # 视口（含预加载边距）内的分区
+    def __visible(self) -> list[tuple[int, int]]:
+        canvas = self.canvas
+        if not canvas._state.height: return []  # 尚未布局
+        left, top, right, bottom = canvas.get_viewport
+        scale, size = canvas._state.scale, self.region_size
+        # 滚动方向上按速度增加预加载边距，边距为窗口像素
+        margin_l, margin_t, margin_r, margin_b = (m / scale for m in canvas._prefetch_margins(self.margin * scale))
+        # 限制在实际画布内
+        right = min(right + margin_r, canvas.canvas_width / scale)
+        bottom = min(bottom + margin_b, canvas.canvas_height / scale)
+        cols = range(max(int((left - margin_l) // size), 0), math.ceil(right / size))
+        rows = range(max(int((top - margin_t) // size), 0), math.ceil(bottom / size))
+        return [(col, row) for row in rows for col in cols]
+
+    # 视口改变后加载新露出的分区，取消滚出视口的加载
+    def update(self, canvas: IkCanvas = None):
+        """
+        视口改变后会自动调用，一般无需手动调用
+        """
+        if self.__closed: return
+        keys = self.__visible()
+        visible = set(keys)
+        for key in [key for key in self.__pending if key not in visible]:
+            self.__cancel(key)
+        for key in keys:
+            if key in self.__loaded or key in self.__pending or key in self.__failed: continue
+            self.__request(key)
+
+    # 提交分区的加载
+    def __request(self, key: tuple[int, int]):
+        rect = self.__rect(key)
+        if self.loop is not None:
+            import asyncio  # 延迟导入，传入loop时asyncio必然已导入，开销只是一次查表
+            future = asyncio.run_coroutine_threadsafe(self.load(rect), self.loop)
+        else:
+            future = self.executor.submit(self.load, rect)
+        self.__pending[key] = future
+        if self.placeholder is not None:
+            canvas = self.canvas
+            item = tk.Canvas._create(
+                canvas, "rectangle", canvas._to_canvas(rect),
+                {"fill": self.placeholder, "width": 0, "tags": "ik_placeholder"}
+            )
+            tk.Canvas.tag_lower(canvas, item)
+            self.__placeholders[key] = item
+        # 完成回调可能在后台线程执行，只放入队列
+        future.add_done_callback(functools.partial(self.__done, key))
+        if self.__poll_id is None:
+            self.__poll_id = self.canvas.after(self.interval, self.__poll)
+
+    def __done(self, key, future):
+        self.__results.put((key, future))
+
+    # 取消分区的加载
+    def __cancel(self, key: tuple[int, int]):
+        self.__pending.pop(key).cancel()
+        self.__remove_placeholder(key)
+
+    def __remove_placeholder(self, key: tuple[int, int]):
+        item = self.__placeholders.pop(key, None)
+        if item is not None: tk.Canvas.delete(self.canvas, item)
+
+    # 分批处理加载结果
+    def __poll(self):
+        self.__poll_id = None
+        if self.__closed: return
+        results = self.__results
+        for _ in range(self.batch):
+            try:
+                key, future = results.get_nowait()
+            except queue.Empty:
+                break
+            if self.__pending.get(key) is not future: continue  # 已取消或已重新加载
+            del self.__pending[key]
+            self.__remove_placeholder(key)
+            if future.cancelled(): continue  # 事件循环一侧取消
+            error = future.exception()
+            if error is not None:
+                self.__failed.add(key)
+                if self.on_error is not None: self.on_error(self.__rect(key), error)
+                continue
+            items = self.render(self.canvas, self.__rect(key), future.result())
+            self.__loaded[key] = list(items) if items is not None else []
+        if self.__pending or not results.empty():
+            self.__poll_id = self.canvas.after(self.interval, self.__poll)
+
+    # 重新加载
+    def reload(self):
+        """
+        删除已绘制的分区、取消加载中的分区并清除失败记录，然后重新加载视口内的分区
+        """
+        for key in list(self.__pending):
+            self.__cancel(key)
+        for items in self.__loaded.values():
+            if items: self.canvas.delete(*items)
+        self.__loaded.clear()
+        self.__failed.clear()
+        self.update()
+
+    # 关闭
+    def close(self):
+        """
+        取消所有加载并停止处理结果，已绘制的元素保留；画布销毁时自动调用
+        """
+        if self.__closed: return
+        self.__closed = True
+        self.canvas.remove_viewport_callback(self.update)
+        for future in self.__pending.values():
+            future.cancel()
+        self.__pending.clear()
+        try:
+            for key in list(self.__placeholders):
+                self.__remove_placeholder(key)
+            if self.__poll_id is not None: self.canvas.after_cancel(self.__poll_id)
+        except tk.TclError:  # 画布已销毁
+            self.__placeholders.clear()
+        self.__poll_id = None
+        if self.__own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 小地图，按元素包围盒的密度绘制画布的缩略图
+class IkMiniMap(tk.Canvas):
+    def __init__(
+            self, master,
+            canvas: IkCanvas,
+            width: int = 160,
+            height: int = 120,
+            cell: int = 4,
+            saturate: int = 8,
+            bg: str = "#FFFFFF",
+            fg: str = "#606060",
+            view_color: str = "#E04040",
+            bd: int = 0, highlightthickness: int = 0,
+            **kwargs
+    ):
+        """
+        画布的二维缩略图，不复制元素，只按包围盒统计每个格子内的元素数绘制密度图，可拖动视口框滚动画布；
+        统计的元素为开启spatial_index或auto_extent时的普通元素，以及虚拟元素；
+        元素增删改时只更新受影响的格子，画布大小或缩放改变时重新统计。
+        :param master: 父容器
+        :param canvas: 绑定的IkCanvas
+        :param width: 小地图宽度
+        :param height: 小地图高度
+        :param cell: 密度格子的边长（小地图像素）
+        :param saturate: 格子内元素数达到该值时颜色最深
+        :param bg: 背景色，即空格子的颜色
+        :param fg: 元素最密集时的颜色
+        :param view_color: 视口框的颜色
+        :param bd: 边框宽度
+        :param highlightthickness: 边框宽度
+        """
+        if not isinstance(canvas, IkCanvas):
+            raise TypeError("canvas must be IkCanvas object")
+        if width <= 0 or height <= 0:
+            raise ValueError("width and height must be greater than 0")
+        if cell <= 0:
+            raise ValueError("cell must be greater than 0")
+        if saturate <= 0:
+            raise ValueError("saturate must be greater than 0")
+        super().__init__(master, width=width, height=height, bg=bg, bd=bd, highlightthickness=highlightthickness, **kwargs)
+        IkProfiler._register(self)
+        self.canvas = canvas
+        self.map_width, self.map_height = width, height
+        self.cell = cell
+        self.__cols, self.__rows = math.ceil(width / cell), math.ceil(height / cell)
+        # 颜色表：元素数0~saturate从bg渐变到fg
+        (r0, g0, b0), (r1, g1, b1) = self.winfo_rgb(bg), self.winfo_rgb(fg)
+        self.__palette = [
+            "#%02x%02x%02x" % tuple(int((a + (b - a) * i / saturate) / 257) for a, b in ((r0, r1), (g0, g1), (b0, b1)))
+            for i in range(saturate + 1)
+        ]
+        self.__counts = [0] * (self.__cols * self.__rows)  # 每个格子的元素数
+        self.__extent = None  # 统计时画布的逻辑大小
+        self.__dirty_rows: set[int] = set()  # 需要重绘的格子行
+        self.__draw_id = None  # 待执行的重绘after id
+        self.__drag = None  # 拖动时鼠标相对视口框左上角的偏移
+        self.__view_box = None  # 已绘制的视口框坐标
+        self.__image = tk.PhotoImage(master=self, width=width, height=height)
+        self.create_image(0, 0, image=self.__image, anchor="nw", tags="density")
+        self.__view = self.create_rectangle(0, 0, 0, 0, outline=view_color, width=2, tags="view")
+        # 监听画布元素与视口的改变
+        self.__indexes = [index for index in (canvas._item_index, canvas._virtual_index) if index is not None]
+        for index in self.__indexes:
+            index.observers.append(self.__on_box)
+        if canvas._virtual_index is None:  # 画布第一次使用虚拟元素时再监听，不为此提前创建虚拟元素的状态
+            canvas._virtual_watchers += (self.__watch_index,)
+        canvas.add_viewport_callback(self.__on_viewport)
+        self.bind("<Button-1>", self.__click)
+        self.bind("<B1-Motion>", self.__motion)
+        self.bind("<ButtonRelease-1>", self.__release)
+        self.bind("<Destroy>", self.__on_destroy)
+        self.rebuild()
+
+    # 画布的逻辑大小
+    def __logical_size(self) -> tuple[float, float]:
+        canvas = self.canvas
+        scale = canvas._state.scale
+        return canvas.canvas_width / scale, canvas.canvas_height / scale
+
+    # 重新统计
+    def rebuild(self):
+        """
+        重新统计所有元素并重绘，画布大小或缩放改变时会自动调用
+        """
+        self.__extent = self.__logical_size()
+        self.__counts = [0] * (self.__cols * self.__rows)
+        for index in self.__indexes:
+            for box in index._boxes.values():
+                self.__add(box, 1)
+        self.__dirty_rows.update(range(self.__rows))
+        self.__schedule()
+        self.__draw_view()
+
+    # 包围盒覆盖的格子计数加减
+    def __add(self, box, delta: int):
+        width, height = self.__extent
+        cols, rows = self.__cols, self.__rows
+        x0, y0, x1, y1 = box
+        if width <= 0 or height <= 0 or x1 < 0 or y1 < 0 or x0 > width or y0 > height: return
+        col0, col1 = max(int(x0 * cols / width), 0), min(int(x1 * cols / width), cols - 1)
+        row0, row1 = max(int(y0 * rows / height), 0), min(int(y1 * rows / height), rows - 1)
+        counts = self.__counts
+        for row in range(row0, row1 + 1):
+            start = row * cols
+            for i in range(start + col0, start + col1 + 1):
+                counts[i] += delta
+        self.__dirty_rows.update(range(row0, row1 + 1))
+
+    # 开始监听画布新建的空间索引
+    def __watch_index(self, index: _GridIndex):
+        self.__indexes.append(index)
+        index.observers.append(self.__on_box)
+
+    # 空间索引中的包围盒改变
+    def __on_box(self, box, delta: int):
+        if box is None:  # 索引被清空
+            self.rebuild()
+            return
+        self.__add(box, delta)
+        self.__schedule()
+
+    def __schedule(self):
+        if self.__draw_id is None and self.__dirty_rows:
+            self.__draw_id = self.after_idle(self.__draw)
+
+    # 只重绘改变的格子行
+    def __draw(self):
+        self.__draw_id = None
+        cols, cell, width = self.__cols, self.cell, self.map_width
+        palette, counts, saturate = self.__palette, self.__counts, len(self.__palette) - 1
+        for row in sorted(self.__dirty_rows):
+            pixels = []
+            for count in counts[row * cols:(row + 1) * cols]:
+                pixels += [palette[min(count, saturate)]] * cell
+            top = row * cell
+            # 一行像素按格子高度平铺
+            self.__image.put("{" + " ".join(pixels[:width]) + "}", to=(0, top, width, min(top + cell, self.map_height)))
+        self.__dirty_rows.clear()
+
+    # 画布视口改变
+    def __on_viewport(self, canvas: IkCanvas):
+        if self.__logical_size() != self.__extent:  # 画布大小或缩放改变
+            self.rebuild()
+        else:
+            self.__draw_view()
+
+    # 绘制视口框
+    def __draw_view(self):
+        width, height = self.__extent
+        if width <= 0 or height <= 0: return
+        left, top, right, bottom = self.canvas.get_viewport
+        sx, sy = self.map_width / width, self.map_height / height
+        box = (round(left * sx), round(top * sy), round(min(right, width) * sx), round(min(bottom, height) * sy))
+        if box != self.__view_box:  # 取整后未变时不发送coords
+            self.__view_box = box
+            self.coords(self.__view, *box)
+
+    # 按下：在视口框内则拖动，否则把视口中心移到该处
+    def __click(self, event):
+        box = self.__view_box or (0, 0, 0, 0)
+        if box[0] <= event.x <= box[2] and box[1] <= event.y <= box[3]:
+            self.__drag = (event.x - box[0], event.y - box[1])
+        else:
+            self.__drag = ((box[2] - box[0]) / 2, (box[3] - box[1]) / 2)
+        self.canvas.stop_scroll()
+        self.__scroll(event)
+
+    def __motion(self, event):
+        if self.__drag is not None: self.__scroll(event)
+
+    def __release(self, event):
+        self.__drag = None
+
+    # 滚动画布，使视口框左上角位于鼠标位置减去偏移处，两个方向同时移动
+    def __scroll(self, event):
+        width, height = self.__extent
+        scale = self.canvas._state.scale
+        x = (event.x - self.__drag[0]) * width / self.map_width * scale
+        y = (event.y - self.__drag[1]) * height / self.map_height * scale
+        self.canvas.scroll_to(x, y, duration=0)
+
+    def __on_destroy(self, event):
+        if str(event.widget) != str(self): return
+        for index in self.__indexes:
+            if self.__on_box in index.observers: index.observers.remove(self.__on_box)
+        watchers = self.canvas._virtual_watchers
+        if self.__watch_index in watchers:
+            self.canvas._virtual_watchers = tuple(func for func in watchers if func != self.__watch_index)
+        self.canvas.remove_viewport_callback(self.__on_viewport)
+        if self.__draw_id is not None:
+            self.after_cancel(self.__draw_id)
+            self.__draw_id = None
+
+
+# 同步滚动组
+class IkScrollGroup:
+    """
+    按方向联动多个IkCanvas，如表格的固定表头（只联动x）、固定行标签（只联动y）与表体（x、y都联动）；
+    任一画布在联动方向上的移动都会先累加，在同一个空闲周期内统一应用到组内所有画布，避免画面撕裂：
+        group = IkScrollGroup()
+        group.add(header, "x")
+        group.add(labels, "y")
+        group.add(body, "xy")
+        group.bind_scroll(y_scrollbar)
+    """
+    def __init__(self):
+        self._members: dict[IkCanvas, str] = {}  # 画布 -> 联动方向
+        self._applying = False  # 正在统一移动，组内画布的move直接执行
+        self.__delta = [0.0, 0.0]  # 累加的移动距离
+        self.__leaders: list[IkCanvas | None] = [None, None]  # 每个方向最后发起移动的画布
+        self.__after_id = None
+        self.__after_owner: IkCanvas | None = None  # 注册after_idle的画布
+
+    # 加入画布
+    def add(self, canvas: IkCanvas, axes: str = "xy"):
+        """
+        :param canvas: IkCanvas
+        :param axes: 联动方向，可选x、y、xy
+        """
+        if not isinstance(canvas, IkCanvas):
+            raise TypeError("canvas must be an instance of IkCanvas")
+        if axes not in ["x", "y", "xy"]:
+            raise ValueError("axes must be 'x', 'y' or 'xy'")
+        if canvas._scroll_group is not None and canvas._scroll_group is not self:
+            raise ValueError("canvas已加入其他滚动组")
+        # 对齐到组内已有画布的位置
+        moved_x = moved_y = None
+        for member, member_axes in self._members.items():
+            if "x" in axes and "x" in member_axes and moved_x is None: moved_x = member.get_moved_count[0]
+            if "y" in axes and "y" in member_axes and moved_y is None: moved_y = member.get_moved_count[1]
+        self._members[canvas] = axes
+        canvas._scroll_group = self
+        if moved_x is not None or moved_y is not None:
+            self._applying = True
+            try:
+                canvas.scroll_to(moved_x, moved_y, duration=0)
+            finally:
+                self._applying = False
+
+    # 移出画布
+    def remove(self, canvas: IkCanvas) -> bool:
+        if self._members.pop(canvas, None) is None: return False
+        canvas._scroll_group = None
+        self.__leaders = [None if leader is canvas else leader for leader in self.__leaders]
+        if self.__after_owner is canvas and self.__after_id is not None:  # 转交给其他画布执行
+            canvas.after_cancel(self.__after_id)
+            self.__after_id = self.__after_owner = None
+            if self._members and any(self.__delta):
+                self.__schedule(next(iter(self._members)))
+        if not self._members:
+            self.__delta = [0.0, 0.0]
+        return True
+
+    # 绑定共用的滚动条
+    def bind_scroll(self, scrollbar: "IkScrollBar", canvas: IkCanvas = None):
+        """
+        让组内画布共用一个IkScrollBar，滚动条驱动的移动同样会应用到整个组
+        :param scrollbar: IkScrollBar
+        :param canvas: 滚动条绑定的画布，默认为组内第一个在滚动条方向上联动的画布，应选择内容最大的画布（如表体）
+        """
+        if not isinstance(scrollbar, IkScrollBar):
+            raise TypeError("scrollbar must be IkScrollBar object")
+        axis = "y" if scrollbar.orient == "v" else "x"
+        if canvas is None:
+            canvas = next((member for member, axes in self._members.items() if axis in axes), None)
+            if canvas is None:
+                raise ValueError(f"组内没有在{axis}方向联动的画布")
+        elif axis not in self._members.get(canvas, ""):
+            raise ValueError(f"canvas未在组内{axis}方向联动")
+        if scrollbar.canvas is not canvas and not scrollbar.bind_canvas(canvas):
+            raise ValueError("scrollbar已绑定其他画布")
+        canvas.bind_scroll(scrollbar)
+
+    # 累加组内画布的移动
+    def _post(self, canvas: IkCanvas, x, y):
+        if x:
+            self.__delta[0] += x
+            self.__leaders[0] = canvas
+        if y:
+            self.__delta[1] += y
+            self.__leaders[1] = canvas
+        self.__schedule(canvas)
+
+    def __schedule(self, canvas: IkCanvas):
+        if self.__after_id is None:
+            self.__after_id = canvas.after_idle(self.__flush)
+            self.__after_owner = canvas
+
+    # 统一移动组内画布
+    def __flush(self):
+        self.__after_id = self.__after_owner = None
+        (dx, dy), self.__delta = self.__delta, [0.0, 0.0]
+        self._applying = True
+        try:
+            for axis, delta, leader in ((0, dx, self.__leaders[0]), (1, dy, self.__leaders[1])):
+                if not delta or leader is None: continue
+                # 先移动发起的画布，其余画布对齐到它的位置，各自超出范围时停在边界
+                if axis == 0: leader.move(delta, 0)
+                else: leader.move(0, delta)
+                target = leader.get_moved_count[axis]
+                name = "x" if axis == 0 else "y"
+                for member, axes in self._members.items():
+                    if member is leader or name not in axes: continue
+                    if axis == 0: member.scroll_to(x=target, duration=0)
+                    else: member.scroll_to(y=target, duration=0)
+        finally:
+            self._applying = False
+
+
+# 共用样式
+class IkStyle:
+    def __init__(
+            self,
+            bg: str = None,
+            scroll_bg: str = None,
+            slider_bg: str = "#CDCDCD",
+            focus_color: str = "#A6A6A6",
+            press_color: str = "#606060",
+    ):
+        """
+        多个IkCanvas、IkScrollBar共用的样式，创建控件时传入style参数即可；
+        滑块各状态的颜色预先整理为字典并由滚动条共用，切换状态只需一次字典查找；
+        configure修改样式后，所有使用该样式的控件的改变在空闲时合并为一个Tcl脚本执行。
+        :param bg: IkCanvas的背景色，None则保持控件自己的背景色
+        :param scroll_bg: IkScrollBar的背景色，None则保持控件自己的背景色
+        :param slider_bg: 滑块无事件时的背景色
+        :param focus_color: 鼠标悬停在滑块上时的颜色
+        :param press_color: 鼠标按下滑块时的颜色
+        """
+        self.options = {
+            "bg": bg, "scroll_bg": scroll_bg,
+            "slider_bg": slider_bg, "focus_color": focus_color, "press_color": press_color,
+        }
+        self.slider_colors: dict[str, str] = {}  # 滑块状态 -> 颜色，与滚动条共用同一个字典
+        self.__resolve()
+        self.__widgets = weakref.WeakSet()  # 使用该样式的控件
+        self.__flush_id = None  # 待执行的更新after id
+        self.__flush_root = None  # 用于after_idle与执行脚本的根窗口
+
+    @property
+    def get_count(self) -> int:
+        """
+        获取使用该样式的控件数量
+        """
+        return len(self.__widgets)
+
+    # 整理各状态的颜色，原地更新供控件共用
+    def __resolve(self):
+        options = self.options
+        self.slider_colors.update(
+            normal=options["slider_bg"], focus=options["focus_color"], press=options["press_color"]
+        )
+
+    # 修改样式
+    def configure(self, **options):
+        """
+        修改样式，参数同初始化，使用该样式的控件在空闲时统一更新
+        """
+        for name in options:
+            if name not in self.options:
+                raise ValueError(f"unknown style option: {name}")
+        self.options.update(options)
+        self.__resolve()
+        self.__schedule()
+
+    config = configure
+
+    # 登记使用该样式的控件
+    def _register(self, widget):
+        self.__widgets.add(widget)
+
+    def __schedule(self):
+        if self.__flush_id is not None: return
+        widget = next(iter(self.__widgets), None)
+        if widget is None: return
+        # 挂在根窗口上，避免控件销毁时回调命令被一并删除导致不再更新
+        self.__flush_root = widget._root()
+        self.__flush_id = self.__flush_root.after_idle(self.__flush)
+
+    # 合并所有控件的改变，只执行一次Tcl脚本
+    def __flush(self):
+        self.__flush_id = None
+        script = []
+        for widget in list(self.__widgets):
+            script += ["catch {" + line + "}" for line in widget._style_script(self)]  # 已销毁的控件忽略
+        if script: self.__flush_root.tk.eval("\n".join(script))
+
+
+# 批量创建控件，结束时统一布局一次
+class IkLayoutBatch:
+    _depth = 0  # 嵌套的层数，大于0时新建的IkCanvas、IkScrollBar按lazy创建
+
+    def __init__(self, master: tk.Misc):
+        """
+        with IkLayoutBatch(root): 内创建的IkCanvas、IkScrollBar（含子类）自动延迟初始化，
+        不再每个控件强制刷新一次布局，退出时刷新一次布局并统一计算所有控件的大小，可以嵌套
+        :param master: 用于刷新布局的控件，一般为根窗口
+        """
+        self.master = master
+
+    def __enter__(self):
+        IkLayoutBatch._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        IkLayoutBatch._depth -= 1
+        if IkLayoutBatch._depth == 0 and exc_type is None:
+            self.master.update_idletasks()  # 整批控件只刷新一次布局
+            _ResizeScheduler.flush_all()
+        return False
+
+
+# 统计Tcl调用次数的解释器代理，calls为累计的命令数，同时计入IkProfiler当前正在统计的函数；
+# 替换控件的tk属性即可统计该控件发出的Tcl命令，itkinter_bench也用它统计每个事件的命令数
+class _ProfilingTk:
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self._nested = isinstance(tkapp, _ProfilingTk)  # 套在另一个代理外时，由内层计入统计的函数，避免重复
+        self.calls = 0
+
+    # 计入所有正在执行的统计函数，与累计耗时一样包含内部调用发出的命令
+    def __count(self):
+        self.calls += 1
+        stack = IkProfiler._stack
+        if stack and not self._nested:
+            stats = IkProfiler._stats
+            for name in (stack if len(stack) == 1 else set(stack)):  # 递归调用只计一次
+                stats[name][3] += 1
+
+    def call(self, *args):
+        self.__count()
+        return self._tkapp.call(*args)
+
+    def eval(self, script):
+        self.__count()
+        return self._tkapp.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+
+# 热点函数的性能统计
+class IkProfiler:
+    """
+    统计IkCanvas、IkScrollBar热点函数的调用次数、累计耗时、最大耗时和发出的Tcl命令数，累计耗时与Tcl命令数都包含内部调用的函数；
+    开启时才替换类上的函数，关闭后恢复原函数，未开启时没有额外开销：
+        IkProfiler.enable()
+        ...
+        print(IkProfiler.snapshot())
+    """
+    # 统计名称 -> (类名, 属性名)
+    _targets: dict[str, tuple[str, str]] = {
+        "IkCanvas.move": ("IkCanvas", "move"),
+        "IkCanvas.__calc": ("IkCanvas", "_IkCanvas__calc"),
+        "IkScrollBar._draw_slider": ("IkScrollBar", "_draw_slider"),
+        "IkScrollBar.commands": ("IkScrollBar", "_run_command"),
+    }
+    enabled = False
+    _stats: dict[str, list] = {name: [0, 0.0, 0.0, 0] for name in _targets}  # [次数, 累计耗时, 最大耗时, Tcl命令数]
+    _stack: list[str] = []  # 正在执行的统计函数
+    _originals: dict[str, object] = {}  # 被替换的原函数
+    _widgets = weakref.WeakSet()  # 存活的IkCanvas、IkScrollBar
+    _overlays = weakref.WeakKeyDictionary()  # 画布 -> (文本元素id, after id)，画布销毁后after回调不再执行，靠弱引用释放
+
+    # 登记控件，开启统计时替换解释器
+    @classmethod
+    def _register(cls, widget):
+        cls._widgets.add(widget)
+        if cls.enabled:
+            widget.tk = _ProfilingTk(widget.tk)
+
+    @classmethod
+    def __wrap(cls, name, func):
+        stats = cls._stats[name]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cls._stack.append(name)
+            begin = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cost = time.perf_counter() - begin
+                cls._stack.pop()
+                stats[0] += 1
+                stats[1] += cost
+                if cost > stats[2]: stats[2] = cost
+        return wrapper
+
+    # 开启统计
+    @classmethod
+    def enable(cls):
+        if cls.enabled: return
+        cls.enabled = True
+        for name, (class_name, attr) in cls._targets.items():
+            owner = globals()[class_name]
+            cls._originals[name] = owner.__dict__[attr]
+            setattr(owner, attr, cls.__wrap(name, owner.__dict__[attr]))
+        for widget in cls._widgets:
+            widget.tk = _ProfilingTk(widget.tk)
+
+    # 关闭统计
+    @classmethod
+    def disable(cls):
+        if not cls.enabled: return
+        cls.enabled = False
+        for name, (class_name, attr) in cls._targets.items():
+            setattr(globals()[class_name], attr, cls._originals.pop(name))
+        for widget in cls._widgets:
+            if isinstance(widget.tk, _ProfilingTk):
+                widget.tk = widget.tk._tkapp
+
+    # 清空统计
+    @classmethod
+    def reset(cls):
+        for stats in cls._stats.values():
+            stats[:] = [0, 0.0, 0.0, 0]
+
+    # 获取统计快照
+    @classmethod
+    def snapshot(cls) -> dict[str, dict]:
+        """
+        :return: {统计名称: {"count": 次数, "total": 累计耗时（秒）, "max": 最大耗时, "mean": 平均耗时, "tcl_calls": Tcl命令数}}
+        """
+        return {
+            name: {
+                "count": count, "total": total, "max": maximum,
+                "mean": total / count if count else 0.0, "tcl_calls": calls,
+            }
+            for name, (count, total, maximum, calls) in cls._stats.items()
+        }
+
+    # 在画布左上角实时显示统计
+    @classmethod
+    def show_overlay(cls, canvas: IkCanvas, interval: int = 500):
+        """
+        在画布视口的左上角显示统计，每interval毫秒刷新一次
+        :param canvas: IkCanvas
+        :param interval: 刷新间隔（毫秒）
+        """
+        cls.hide_overlay(canvas)
+        # 不经过IkCanvas._create，避免登记到空间索引
+        text = tk.Canvas._create(canvas, "text", (0, 0), {"anchor": "nw", "font": "TkFixedFont", "tags": "ik_profiler"})
+        cls._overlays[canvas] = (text, None)
+
+        def refresh():
+            if canvas not in cls._overlays: return
+            lines = [f"{'name':<26}{'count':>8}{'total ms':>10}{'max ms':>9}{'tcl':>8}"]
+            for name, stats in cls.snapshot().items():
+                lines.append(
+                    f"{name:<26}{stats['count']:>8}{stats['total'] * 1000:>10.1f}"
+                    f"{stats['max'] * 1000:>9.2f}{stats['tcl_calls']:>8}"
+                )
+            # 窗口坐标(4, 4)对应的画布坐标
+            off_x, off_y = canvas._canvas_offset()
+            canvas.coords(text, 4 - canvas._state.x + off_x, 4 - canvas._state.y + off_y)
+            canvas.itemconfig(text, text="\n".join(lines))
+            canvas.tag_raise(text)
+            cls._overlays[canvas] = (text, canvas.after(interval, refresh))
+        refresh()
+
+    # 移除统计显示
+    @classmethod
+    def hide_overlay(cls, canvas: IkCanvas):
+        text, after_id = cls._overlays.pop(canvas, (None, None))
+        if text is None: return
+        try:
+            if after_id is not None: canvas.after_cancel(after_id)
+            tk.Canvas.delete(canvas, text)
+        except tk.TclError:
+            pass
@@ -0,0 +1,322 @@
+"""
+itkinter性能测试，需要图形环境，Linux下可用Xvfb运行：
+    xvfb-run -a python itkinter_bench.py all --counts 100 10000 500000 --output result.json
+测试项目：
+    hit     items_at对比find_overlapping的命中检测
+    wheel   <MouseWheel>滚动画布
+    drag    拖动IkScrollBar滑块
+    resize  父容器大小改变
+    build   批量创建画布与滚动条，对比逐个初始化与IkLayoutBatch
+    memory  每个IkScrollBar、IkCanvas实例的Python内存（tracemalloc）与Tcl命令数，--counts为实例数
+    all     以上全部
+加上--profile可附带IkProfiler统计的热点函数耗时与Tcl命令数
+结果以JSON格式输出，便于跨版本对比
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tkinter as tk
+import tracemalloc
+
+from itkinter import IkCanvas, IkLayoutBatch, IkProfiler, IkScrollBar, _ProfilingTk
+
+_WIDTH, _HEIGHT = 800, 600  # 画布展示的大小
+
+
+# 统计耗时分位数，单位微秒
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def pick(ratio: float) -> float:
+        return round(samples[min(int(len(samples) * ratio), len(samples) - 1)] * 1e6, 2)
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": round(samples[-1] * 1e6, 2)}
+
+
+# 汇总一组事件的耗时
+def _summary(count: int, samples: list[float], calls: int, saved: int = None) -> dict:
+    total = sum(samples)
+    result = {
+        "items": count,
+        "events": len(samples),
+        "latency_us": _percentiles(samples),
+        "events_per_s": round(len(samples) / total, 1) if total else None,
+        "tcl_calls_per_event": round(calls / len(samples), 2) if samples else None,
+    }
+    if saved is not None:  # IkScrollBar因位置、颜色未变而省去的调用
+        result["saved_calls_per_event"] = round(saved / len(samples), 2) if samples else None
+    return result
+
+
+# 通过根窗口的解释器发送事件，不计入控件的Tcl调用次数
+def _generate(root: tk.Tk, widget: tk.Misc, sequence: str, **kw):
+    args = []
+    for key, value in kw.items():
+        args += ["-" + key, value]
+    root.tk.call("event", "generate", widget._w, sequence, *args)
+
+
+# 创建测试用的画布，元素为随机分布的小矩形
+def _build_canvas(root: tk.Tk, count: int, seed: int = 0, expand: bool = False, **kwargs) -> IkCanvas:
+    size = max(int((count * 2500) ** 0.5), 2000)  # 每个元素平均占50x50的面积
+    if expand:
+        canvas = IkCanvas(root, camvas_width=size, canvas_height=size, **kwargs)
+    else:
+        canvas = IkCanvas(
+            root, expand_width=False, expand_height=False, show_width=_WIDTH, show_height=_HEIGHT,
+            camvas_width=size, canvas_height=size, **kwargs
+        )
+    canvas.place(x=0, y=0)
+    rnd = random.Random(seed)
+    for _ in range(count):
+        x, y = rnd.uniform(0, size), rnd.uniform(0, size)
+        canvas.create_rectangle(x, y, x + rnd.uniform(5, 40), y + rnd.uniform(5, 40), fill="#CDCDCD", width=0)
+    root.update()
+    return canvas
+
+
+# 创建绑定画布的垂直滚动条
+def _build_scrollbar(root: tk.Tk, canvas: IkCanvas, expand: bool = False) -> IkScrollBar:
+    scrollbar = IkScrollBar(root, canvas=canvas, orient="v", expand=expand, scroll_height=_HEIGHT)
+    scrollbar.place(x=_WIDTH, y=0)
+    canvas.bind_scroll(scrollbar)
+    root.update()
+    return scrollbar
+
+
+def _new_root() -> tk.Tk:
+    root = tk.Tk()
+    root.geometry(f"{_WIDTH + 20}x{_HEIGHT}")
+    root.update()
+    return root
+
+
+# 命中检测：items_at对比find_overlapping
+def bench_hit_test(counts=(1000, 10000, 100000), events: int = 1000, seed: int = 0, mode: str = "move") -> list[dict]:
+    root = _new_root()
+    results = []
+    try:
+        for count in counts:
+            canvas = _build_canvas(root, count, seed, spatial_index=True, scroll_mode=mode)
+            rnd = random.Random(seed + 1)
+            size = canvas.canvas_width
+            points = [(rnd.uniform(0, size), rnd.uniform(0, size)) for _ in range(events)]
+            index_times, tk_times = [], []
+            for x, y in points:
+                start = time.perf_counter()
+                canvas.items_at(x, y)
+                index_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                canvas.find_overlapping(x, y, x, y)
+                tk_times.append(time.perf_counter() - start)
+            index_total, tk_total = sum(index_times), sum(tk_times)
+            results.append({
+                "items": count,
+                "queries": events,
+                "items_at_us": _percentiles(index_times),
+                "find_overlapping_us": _percentiles(tk_times),
+                "speedup": round(tk_total / index_total, 2) if index_total else None,
+            })
+            canvas.destroy()
+    finally:
+        root.destroy()
+    return results
+
+
+# 滚轮滚动：每个事件包含处理与重绘的耗时
+def bench_wheel(counts=(100, 10000, 100000), events: int = 500, seed: int = 0, mode: str = "move") -> list[dict]:
+    root = _new_root()
+    results = []
+    try:
+        for count in counts:
+            canvas = _build_canvas(root, count, seed, scroll_mode=mode)
+            scrollbar = _build_scrollbar(root, canvas)
+            counter = canvas.tk = scrollbar.tk = _ProfilingTk(canvas.tk)
+            saved = scrollbar.get_saved_calls
+            samples = []
+            for i in range(events):
+                delta = -120 if (i // 100) % 2 == 0 else 120  # 每100次换一次方向，避免一直停在边界
+                start = time.perf_counter()
+                _generate(root, canvas, "<MouseWheel>", delta=delta, x=10, y=10)
+                root.update_idletasks()
+                samples.append(time.perf_counter() - start)
+            results.append(_summary(count, samples, counter.calls, scrollbar.get_saved_calls - saved))
+            canvas.tk = scrollbar.tk = counter._tkapp
+            scrollbar.destroy()
+            canvas.destroy()
+    finally:
+        root.destroy()
+    return results
+
+
+# 拖动滑块：按下滑块后逐像素移动
+def bench_drag(counts=(100, 10000, 100000), events: int = 500, seed: int = 0, mode: str = "move") -> list[dict]:
+    root = _new_root()
+    results = []
+    try:
+        for count in counts:
+            canvas = _build_canvas(root, count, seed, scroll_mode=mode)
+            scrollbar = _build_scrollbar(root, canvas)
+            x0, y0, x1, y1 = scrollbar.coords("slider")
+            x, y = int((x0 + x1) / 2), int((y0 + y1) / 2)
+            _generate(root, scrollbar, "<Enter>", x=x, y=y)
+            _generate(root, scrollbar, "<Motion>", x=x, y=y)  # 进入滑块
+            _generate(root, scrollbar, "<Button-1>", x=x, y=y)
+            counter = canvas.tk = scrollbar.tk = _ProfilingTk(canvas.tk)
+            saved = scrollbar.get_saved_calls
+            samples = []
+            for i in range(events):
+                y += 1 if (i // 100) % 2 == 0 else -1
+                start = time.perf_counter()
+                _generate(root, scrollbar, "<Motion>", x=x, y=y)
+                root.update_idletasks()
+                samples.append(time.perf_counter() - start)
+            results.append(_summary(count, samples, counter.calls, scrollbar.get_saved_calls - saved))
+            canvas.tk = scrollbar.tk = counter._tkapp
+            _generate(root, scrollbar, "<ButtonRelease-1>", x=x, y=y)
+            scrollbar.destroy()
+            canvas.destroy()
+    finally:
+        root.destroy()
+    return results
+
+
+# 父容器大小改变：交替改变根窗口大小
+def bench_resize(counts=(100, 10000, 100000), events: int = 100, seed: int = 0, mode: str = "move") -> list[dict]:
+    results = []
+    for count in counts:
+        root = _new_root()
+        try:
+            canvas = _build_canvas(root, count, seed, expand=True, scroll_mode=mode)
+            scrollbar = _build_scrollbar(root, canvas, expand=True)
+            counter = canvas.tk = scrollbar.tk = _ProfilingTk(canvas.tk)
+            samples = []
+            for i in range(events):
+                step = i % 20 if (i // 20) % 2 == 0 else 20 - i % 20
+                start = time.perf_counter()
+                root.geometry(f"{_WIDTH + 20 - step * 10}x{_HEIGHT - step * 10}")
+                root.update()
+                samples.append(time.perf_counter() - start)
+            results.append(_summary(count, samples, counter.calls))
+            canvas.tk = scrollbar.tk = counter._tkapp
+        finally:
+            root.destroy()
+    return results
+
+
+# 批量创建：count组画布与滚动条，计时到全部显示完成
+def bench_build(counts=(10, 50, 200), events: int = 1, seed: int = 0, mode: str = "move") -> list[dict]:
+    def build(root, count):
+        for i in range(count):
+            canvas = IkCanvas(
+                root, expand_width=False, expand_height=False, show_width=80, show_height=60,
+                camvas_width=400, canvas_height=400, scroll_mode=mode
+            )
+            canvas.place(x=i % 10 * 100, y=i // 10 * 70)
+            scrollbar = IkScrollBar(root, canvas=canvas, orient="v", expand=False, scroll_height=60)
+            scrollbar.place(x=i % 10 * 100 + 82, y=i // 10 * 70)
+            canvas.bind_scroll(scrollbar)
+
+    results = []
+    for count in counts:
+        result = {"widgets": count * 2}
+        for name in ("eager", "batch"):
+            samples = []
+            for _ in range(events):
+                root = _new_root()
+                try:
+                    start = time.perf_counter()
+                    if name == "batch":
+                        with IkLayoutBatch(root):
+                            build(root, count)
+                    else:
+                        build(root, count)
+                    root.update()
+                    samples.append(time.perf_counter() - start)
+                finally:
+                    root.destroy()
+            result[name + "_ms"] = round(min(samples) * 1000, 2)
+        results.append(result)
+    return results
+
+
+# 内存占用：tracemalloc统计每个实例的Python内存，并统计每个实例新增的Tcl命令数
+def bench_memory(counts=(1000, 10000), events: int = 1, seed: int = 0, mode: str = "move") -> list[dict]:
+    def create(root, name):
+        if name == "scrollbar":
+            return IkScrollBar(root, orient="v", expand=False, scroll_height=60)
+        return IkCanvas(
+            root, expand_width=False, expand_height=False, show_width=80, show_height=60,
+            camvas_width=400, canvas_height=400, scroll_mode=mode
+        )
+
+    results = []
+    for count in counts:
+        result = {"instances": count}
+        for name in ("scrollbar", "canvas"):
+            root = _new_root()
+            try:
+                commands = len(root.tk.splitlist(root.tk.call("info", "commands")))
+                tracemalloc.start()
+                with IkLayoutBatch(root):
+                    widgets = [create(root, name) for _ in range(count)]
+                used = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                commands = len(root.tk.splitlist(root.tk.call("info", "commands"))) - commands
+                result[name + "_bytes_per_instance"] = round(used / len(widgets), 1)
+                result[name + "_tcl_commands_per_instance"] = round(commands / len(widgets), 2)
+            finally:
+                root.destroy()
+        results.append(result)
+    return results
+
+
+_BENCHES = {
+    "hit": bench_hit_test,
+    "wheel": bench_wheel,
+    "drag": bench_drag,
+    "resize": bench_resize,
+    "build": bench_build,
+    "memory": bench_memory,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="itkinter性能测试")
+    parser.add_argument("bench", choices=sorted(_BENCHES) + ["all"], help="测试项目")
+    parser.add_argument("--counts", type=int, nargs="+", default=None, help="元素数量，如100 10000 500000")
+    parser.add_argument("--events", type=int, default=None, help="每个数量下发送的事件数")
+    parser.add_argument("--mode", choices=["move", "view"], default="move", help="IkCanvas的scroll_mode")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", default=None, help="JSON输出文件，默认输出到标准输出")
+    parser.add_argument("--profile", action="store_true", help="开启IkProfiler，在结果中附带热点函数统计")
+    args = parser.parse_args(argv)
+    kwargs = {"seed": args.seed, "mode": args.mode}
+    if args.counts: kwargs["counts"] = tuple(args.counts)
+    if args.events: kwargs["events"] = args.events
+    names = sorted(_BENCHES) if args.bench == "all" else [args.bench]
+    if args.profile: IkProfiler.enable()
+    report = {
+        "python": platform.python_version(),
+        "tk_version": tk.TkVersion,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "mode": args.mode,
+        "results": {name: _BENCHES[name](**kwargs) for name in names},
+    }
+    if args.profile:
+        report["profile"] = IkProfiler.snapshot()
+        IkProfiler.disable()
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()